@@ -0,0 +1,37 @@
+"""
+Build script for the optional ahead-of-time compiled trajectory kernel.
+
+    pip install numba
+    python build_kernel.py
+
+This compiles md_kernel.run_md with numba.pycc into the src/md_aot
+extension. The Streamlit app imports it when present, so a fresh server
+process skips the JIT compilation of the kernel on its first run; without
+it the app uses the JIT-compiled md_kernel.run_md.
+"""
+
+import os
+import sys
+
+from numba.pycc import CC
+
+_src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+sys.path.insert(0, _src_dir)
+
+from md_kernel import run_md  # noqa: E402
+
+cc = CC('md_aot')
+cc.output_dir = _src_dir
+
+# run_md(pos, vel, force, accel, mass, is_fixed, epsilon, sigma, box_w,
+#        box_h, dt, n_steps, coll_counts, out_pos1, out_pos2, out_coll1,
+#        out_coll2, out_ke, out_pe)
+cc.export(
+    'run_md',
+    'void(f8[:, :], f8[:, :], f8[:, :], f8[:, :], f8[:], u1[:], '
+    'f8, f8, f8, f8, f8, i8, i8[:], '
+    'f8[:, :], f8[:, :], i8[:], i8[:], f8[:], f8[:])'
+)(run_md.py_func)
+
+if __name__ == '__main__':
+    cc.compile()
@@ -0,0 +1,123 @@
+"""
+MPI Example - Save this as mpi_example.py and run with:
+    mpiexec -n 4 python mpi_example.py
+
+This demonstrates basic MPI concepts for MD simulations.
+"""
+
+from mpi4py import MPI
+import numpy as np
+import time
+
+def mpi_hello_world():
+    """Basic MPI: Each process prints its rank."""
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    print(f"Hello from rank {rank} of {size} processes")
+    return rank, size
+
+def mpi_parallel_sum():
+    """Demonstrate MPI reduction (sum across all processes)."""
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+
+    # Each process has a local value
+    local_value = rank * 10
+
+    # Sum across all processes
+    total = comm.allreduce(local_value, op=MPI.SUM)
+
+    if rank == 0:
+        print(f"\nMPI Reduction: Sum of all ranks = {total}")
+
+    return total
+
+def mpi_domain_decomposition():
+    """Simulate domain decomposition for MD."""
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    # Total particles divided among processes
+    total_particles = 1000
+    local_n = total_particles // size
+
+    # Each rank initializes its local particles
+    rng = np.random.default_rng(rank)
+    local_positions = rng.random((local_n, 3)) * 20.0
+    local_velocities = rng.random((local_n, 3)) * 0.1
+
+    # Simulate some work (position update)
+    dt = 0.001
+    start = time.time()
+    for _ in range(100):
+        local_positions += local_velocities * dt
+    elapsed = time.time() - start
+
+    # Gather timing from all ranks
+    all_times = comm.gather(elapsed, root=0)
+
+    if rank == 0:
+        print(f"\nMPI Domain Decomposition:")
+        print(f"  Total particles: {total_particles}")
+        print(f"  Particles per rank: {local_n}")
+        print(f"  Average time: {np.mean(all_times):.4f}s")
+        print(f"  Max time: {np.max(all_times):.4f}s")
+        print(f"  Min time: {np.min(all_times):.4f}s")
+
+def mpi_replica_exchange():
+    """Simulate replica exchange (each rank = different temperature)."""
+    comm = MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    size = comm.Get_size()
+
+    # Each rank has different temperature
+    base_temp = 300.0
+    temperature = base_temp * (1.1 ** rank)
+
+    print(f"Rank {rank}: Running at T = {temperature:.2f} K")
+
+    # Simulate energy calculation
+    rng = np.random.default_rng(rank)
+    energy = rng.standard_normal() * temperature
+
+    # Exchange energies with neighbor
+    if rank % 2 == 0 and rank + 1 < size:
+        partner = rank + 1
+        partner_energy = comm.sendrecv(energy, dest=partner, source=partner)
+
+        if rank == 0:
+            print(f"\nReplica Exchange: Rank {rank} ↔ Rank {partner}")
+            print(f"  Energy {rank}: {energy:.4f}")
+            print(f"  Energy {partner}: {partner_energy:.4f}")
+
+if __name__ == "__main__":
+    # Run all MPI examples
+    rank, size = mpi_hello_world()
+
+    comm = MPI.COMM_WORLD
+    comm.Barrier()  # Synchronize
+
+    if rank == 0:
+        print("\n" + "=" * 60)
+
+    mpi_parallel_sum()
+    comm.Barrier()
+
+    if rank == 0:
+        print("=" * 60)
+
+    mpi_domain_decomposition()
+    comm.Barrier()
+
+    if rank == 0:
+        print("=" * 60)
+
+    mpi_replica_exchange()
+
+    if rank == 0:
+        print("=" * 60)
+        print("\nMPI examples complete!")
+        print("\nTo run: mpiexec -n 4 python mpi_example.py")
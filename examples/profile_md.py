@@ -20,6 +20,7 @@ Requirements:
 
 import sys
 import os
+import math
 import time
 import cProfile
 import pstats
@@ -124,8 +125,10 @@ def component_timing():
     # Time force calculation (via potential)
     start = time.perf_counter()
     for _ in range(n_iterations):
-        r_vector = sim.particle1.position - sim.particle2.position
-        r = np.linalg.norm(r_vector)
+        # Scalar math: np.linalg.norm on a 2-vector is mostly call overhead
+        rx = sim.particle1.position[0] - sim.particle2.position[0]
+        ry = sim.particle1.position[1] - sim.particle2.position[1]
+        r = math.sqrt(rx * rx + ry * ry)
         force_mag = sim.potential.force_magnitude(r)
     force_calc_time = time.perf_counter() - start
 
@@ -157,32 +160,34 @@ def memory_usage():
     
     import tracemalloc
     
-    # Start tracing
-    tracemalloc.start()
-    
-    # Create simulation
-    particle1 = Particle(position=np.array([5.0, 5.0]), velocity=np.array([0.1, 0.0]), is_fixed=True)
-    particle2 = Particle(position=np.array([8.0, 5.0]), velocity=np.array([-0.05, 0.0]))
-    potential = LennardJonesPotential()
-    sim = TwoParticleMD(particle1, particle2, potential, box_size=(20.0, 20.0))
-    
-    # Run simulation
-    sim.run(1000, record_interval=10)
+    # Start tracing with a 1-frame traceback (the default hook records 25
+    # frames per allocation and slows the traced run down several times).
+    # Tracing is confined to this function so it cannot skew other timings.
+    tracemalloc.start(1)
+    try:
+        # Create simulation
+        particle1 = Particle(position=np.array([5.0, 5.0]), velocity=np.array([0.1, 0.0]), is_fixed=True)
+        particle2 = Particle(position=np.array([8.0, 5.0]), velocity=np.array([-0.05, 0.0]))
+        potential = LennardJonesPotential()
+        sim = TwoParticleMD(particle1, particle2, potential, box_size=(20.0, 20.0))
+        
+        # Run simulation
+        sim.run(1000, record_interval=10)
+        
+        # Single snapshot after the run, plus current and peak memory
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
     
-    # Get memory snapshot
-    snapshot = tracemalloc.take_snapshot()
     top_stats = snapshot.statistics('lineno')
     
     print("Top 10 memory allocations:")
     for stat in top_stats[:10]:
         print(f"  {stat}")
     
-    # Get current and peak memory
-    current, peak = tracemalloc.get_traced_memory()
     print(f"\nCurrent memory usage: {current / 1024 / 1024:.2f} MB")
     print(f"Peak memory usage: {peak / 1024 / 1024:.2f} MB")
-    
-    tracemalloc.stop()
     print()
 
 
@@ -213,6 +218,26 @@ def scaling_analysis():
 
         print(f"{n_steps:<10} {elapsed:<12.4f} {time_per_step:<18.6f} {steps_per_sec:<12.1f}")
 
+    # Same runs through the compiled kernel (no per-step Python dispatch)
+    print("\nCompiled kernel (sim.run_numba):")
+    print(f"{'Steps':<10} {'Time (s)':<12} {'Time/Step (ms)':<18} {'Steps/sec':<12}")
+    print("-" * 70)
+
+    # Warm-up (JIT compilation happens here)
+    TwoParticleMD(particle1, particle2, potential, box_size=(20.0, 20.0)).run_numba(1)
+
+    for n_steps in step_counts:
+        sim = TwoParticleMD(particle1, particle2, potential, box_size=(20.0, 20.0))
+
+        start = time.perf_counter()
+        sim.run_numba(n_steps)
+        elapsed = time.perf_counter() - start
+
+        time_per_step = elapsed / n_steps * 1000  # ms
+        steps_per_sec = n_steps / elapsed
+
+        print(f"{n_steps:<10} {elapsed:<12.4f} {time_per_step:<18.6f} {steps_per_sec:<12.1f}")
+
     print()
 
 
@@ -0,0 +1,20 @@
+"""
+Build script for the optional Cython step kernel.
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+This places the compiled src/_md_kernels extension next to md_simulation.py.
+The simulation runs without it (falling back to the Numba kernels).
+"""
+
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+setup(
+    name="two_particles_md_kernels",
+    ext_modules=cythonize(
+        [Extension("src._md_kernels", ["src/_md_kernels.pyx"])],
+        language_level=3,
+    ),
+)
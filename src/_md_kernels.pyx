@@ -0,0 +1,171 @@
+# cython: language_level=3
+"""
+Cython build of the two-particle Velocity Verlet kernel.
+
+Optional ahead-of-time compiled version of _verlet_step,
+_verlet_step_one_mobile and _step_kernel in md_simulation.py, with the same
+arguments and in-place semantics. Build it with
+``python setup.py build_ext --inplace``; md_simulation uses it when the
+extension is importable and falls back to the Numba kernels otherwise.
+"""
+
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline bint _reflect_walls(double[:, ::1] pos, double[:, ::1] vel,
+                                Py_ssize_t k, double box_w,
+                                double box_h) noexcept nogil:
+    cdef bint collided = False
+
+    # Interior fast path: one combined test, and the individual walls
+    # are only examined when the particle reached the boundary
+    if 0.0 < pos[k, 0] < box_w and 0.0 < pos[k, 1] < box_h:
+        return False
+    if pos[k, 0] <= 0.0:
+        pos[k, 0] = 0.0
+        vel[k, 0] = abs(vel[k, 0])  # Bounce right
+        collided = True
+    elif pos[k, 0] >= box_w:
+        pos[k, 0] = box_w
+        vel[k, 0] = -abs(vel[k, 0])  # Bounce left
+        collided = True
+    if pos[k, 1] <= 0.0:
+        pos[k, 1] = 0.0
+        vel[k, 1] = abs(vel[k, 1])  # Bounce up
+        collided = True
+    elif pos[k, 1] >= box_h:
+        pos[k, 1] = box_h
+        vel[k, 1] = -abs(vel[k, 1])  # Bounce down
+        collided = True
+    return collided
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef inline void _pair_force(double[:, ::1] pos, double[:, ::1] force,
+                             double epsilon, double sigma) noexcept nogil:
+    # LJ force at the current positions (r^2 form, no square root)
+    cdef double dx = pos[0, 0] - pos[1, 0]
+    cdef double dy = pos[0, 1] - pos[1, 1]
+    cdef double r2 = dx * dx + dy * dy
+    cdef double inv_r2, sr2, sr6
+    cdef double f_over_r = 0.0
+    if r2 >= 1e-20:
+        inv_r2 = 1.0 / r2
+        sr2 = sigma * sigma * inv_r2
+        sr6 = sr2 * sr2 * sr2
+        f_over_r = 24.0 * epsilon * inv_r2 * (2.0 * sr6 * sr6 - sr6)
+    force[0, 0] = f_over_r * dx
+    force[0, 1] = f_over_r * dy
+    force[1, 0] = -force[0, 0]
+    force[1, 1] = -force[0, 1]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef inline void _step(double[:, ::1] pos, double[:, ::1] vel,
+                       double[:, ::1] force, double[:, ::1] accel,
+                       const double[::1] mass, const unsigned char[::1] is_fixed,
+                       double box_w, double box_h, double dt,
+                       double epsilon, double sigma,
+                       long long[::1] coll_counts) noexcept nogil:
+    cdef double half_dt2 = 0.5 * dt * dt
+    cdef double new_ax, new_ay
+    cdef Py_ssize_t k
+
+    # Stage 1: position update and elastic wall collisions
+    for k in range(2):
+        if is_fixed[k]:
+            continue
+        pos[k, 0] += vel[k, 0] * dt + half_dt2 * accel[k, 0]
+        pos[k, 1] += vel[k, 1] * dt + half_dt2 * accel[k, 1]
+        if _reflect_walls(pos, vel, k, box_w, box_h):
+            coll_counts[k] += 1
+
+    _pair_force(pos, force, epsilon, sigma)
+
+    # Stage 2: velocity update with the average acceleration
+    for k in range(2):
+        new_ax = force[k, 0] / mass[k]
+        new_ay = force[k, 1] / mass[k]
+        if not is_fixed[k]:
+            vel[k, 0] += 0.5 * (accel[k, 0] + new_ax) * dt
+            vel[k, 1] += 0.5 * (accel[k, 1] + new_ay) * dt
+        accel[k, 0] = new_ax
+        accel[k, 1] = new_ay
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef inline void _step_one_mobile(double[:, ::1] pos, double[:, ::1] vel,
+                                  double[:, ::1] force, double[:, ::1] accel,
+                                  const double[::1] mass, Py_ssize_t k,
+                                  double box_w, double box_h, double dt,
+                                  double epsilon, double sigma,
+                                  long long[::1] coll_counts) noexcept nogil:
+    cdef double half_dt2 = 0.5 * dt * dt
+    cdef double new_ax, new_ay
+
+    pos[k, 0] += vel[k, 0] * dt + half_dt2 * accel[k, 0]
+    pos[k, 1] += vel[k, 1] * dt + half_dt2 * accel[k, 1]
+    if _reflect_walls(pos, vel, k, box_w, box_h):
+        coll_counts[k] += 1
+
+    _pair_force(pos, force, epsilon, sigma)
+
+    new_ax = force[k, 0] / mass[k]
+    new_ay = force[k, 1] / mass[k]
+    vel[k, 0] += 0.5 * (accel[k, 0] + new_ax) * dt
+    vel[k, 1] += 0.5 * (accel[k, 1] + new_ay) * dt
+    accel[k, 0] = new_ax
+    accel[k, 1] = new_ay
+
+
+cpdef void verlet_step(double[:, ::1] pos, double[:, ::1] vel,
+                       double[:, ::1] force, double[:, ::1] accel,
+                       const double[::1] mass, const unsigned char[::1] is_fixed,
+                       double box_w, double box_h, double dt,
+                       double epsilon, double sigma,
+                       long long[::1] coll_counts):
+    """One Velocity Verlet step (same arguments as md_simulation._verlet_step)."""
+    with nogil:
+        _step(pos, vel, force, accel, mass, is_fixed, box_w, box_h, dt,
+              epsilon, sigma, coll_counts)
+
+
+cpdef void verlet_step_one_mobile(double[:, ::1] pos, double[:, ::1] vel,
+                                  double[:, ::1] force, double[:, ::1] accel,
+                                  const double[::1] mass, Py_ssize_t mobile,
+                                  double box_w, double box_h, double dt,
+                                  double epsilon, double sigma,
+                                  long long[::1] coll_counts):
+    """Step with one fixed particle (see md_simulation._verlet_step_one_mobile)."""
+    with nogil:
+        _step_one_mobile(pos, vel, force, accel, mass, mobile, box_w, box_h,
+                         dt, epsilon, sigma, coll_counts)
+
+
+cpdef void step_kernel(double[:, ::1] pos, double[:, ::1] vel,
+                       double[:, ::1] force, double[:, ::1] accel,
+                       const double[::1] mass, const unsigned char[::1] is_fixed,
+                       double box_w, double box_h, double dt,
+                       double epsilon, double sigma, long n_steps,
+                       long long[::1] coll_counts):
+    """Advance n_steps Verlet steps (same arguments as md_simulation._step_kernel)."""
+    cdef long i
+    cdef Py_ssize_t mobile
+    with nogil:
+        if is_fixed[0] != is_fixed[1]:
+            mobile = 1 if is_fixed[0] else 0
+            for i in range(n_steps):
+                _step_one_mobile(pos, vel, force, accel, mass, mobile,
+                                 box_w, box_h, dt, epsilon, sigma, coll_counts)
+        else:
+            for i in range(n_steps):
+                _step(pos, vel, force, accel, mass, is_fixed, box_w, box_h,
+                      dt, epsilon, sigma, coll_counts)
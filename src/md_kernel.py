@@ -0,0 +1,94 @@
+"""
+Compiled trajectory kernel for the Streamlit app.
+
+The app records every time step, so instead of calling TwoParticleMD.step()
+and get_energies() from Python once per step, the whole Velocity Verlet loop
+runs in one compiled function that writes the trajectory straight into
+preallocated output arrays. Each step is the compiled step kernel of
+md_simulation (elastic walls, fixed particles, LJ force in the r^2 form);
+this module only adds the per-step recording. Without Numba installed the
+kernel runs as plain Python.
+"""
+
+import numpy as np
+
+try:
+    from .md_simulation import NUMBA_AVAILABLE, njit, _verlet_step, _verlet_step_one_mobile
+except ImportError:
+    from md_simulation import NUMBA_AVAILABLE, njit, _verlet_step, _verlet_step_one_mobile
+
+# fastmath without 'nnan'/'ninf': the pair energy is inf for overlapping
+# particles, which must reach the recorded output unchanged
+FASTMATH_FLAGS = {'nsz', 'arcp', 'contract', 'reassoc'}
+
+
+@njit(fastmath=FASTMATH_FLAGS)
+def lj_energy(dx, dy, epsilon, sigma):
+    """
+    Lennard-Jones pair energy for (dx, dy) = r1 - r2, in the r^2 form.
+
+    Returns:
+        Potential energy; inf when the particles overlap
+    """
+    r2 = dx * dx + dy * dy
+    if r2 < 1e-20:
+        return np.inf
+    sr2 = sigma * sigma / r2
+    sr6 = sr2 * sr2 * sr2
+    return 4.0 * epsilon * sr6 * (sr6 - 1.0)
+
+
+@njit(fastmath=FASTMATH_FLAGS)
+def run_md(pos, vel, force, accel, mass, is_fixed, epsilon, sigma, box_w,
+           box_h, dt, n_steps, coll_counts, out_pos1, out_pos2, out_coll1,
+           out_coll2, out_ke, out_pe):
+    """
+    Advance n_steps Velocity Verlet steps, recording the state after each.
+
+    The state arrays are updated in place, so consecutive calls continue
+    the same trajectory. Row i of every output array holds the state after
+    step i + 1 of this call (the caller records the initial state).
+    Velocities are not recorded; the final ones are left in vel.
+
+    Args:
+        pos, vel, force, accel: (2, 2) state arrays, one row per particle
+        mass: (2,) particle masses
+        is_fixed: (2,) flags, nonzero for fixed particles
+        epsilon, sigma: Lennard-Jones parameters
+        box_w, box_h: Box width and height
+        dt: Time step
+        n_steps: Number of steps to run
+        coll_counts: (2,) int64 wall collision counters
+        out_pos1, out_pos2: (>= n_steps, 2) position outputs
+        out_coll1, out_coll2: (>= n_steps,) collision count outputs
+        out_ke, out_pe: (>= n_steps,) kinetic and potential energy outputs
+            (fixed particles contribute no kinetic energy)
+    """
+    # Same dispatch as md_simulation._step_kernel
+    mobile = -1
+    if is_fixed[0] != is_fixed[1]:
+        mobile = 1 if is_fixed[0] else 0
+
+    for i in range(n_steps):
+        if mobile < 0:
+            _verlet_step(pos, vel, force, accel, mass, is_fixed, box_w, box_h,
+                         dt, epsilon, sigma, coll_counts)
+        else:
+            _verlet_step_one_mobile(pos, vel, force, accel, mass, mobile,
+                                    box_w, box_h, dt, epsilon, sigma,
+                                    coll_counts)
+
+        # Record the state after this step
+        ke = 0.0
+        for k in range(2):
+            if not is_fixed[k]:
+                ke += 0.5 * mass[k] * (vel[k, 0] * vel[k, 0] + vel[k, 1] * vel[k, 1])
+        out_pos1[i, 0] = pos[0, 0]
+        out_pos1[i, 1] = pos[0, 1]
+        out_pos2[i, 0] = pos[1, 0]
+        out_pos2[i, 1] = pos[1, 1]
+        out_coll1[i] = coll_counts[0]
+        out_coll2[i] = coll_counts[1]
+        out_ke[i] = ke
+        out_pe[i] = lj_energy(pos[0, 0] - pos[1, 0], pos[0, 1] - pos[1, 1],
+                              epsilon, sigma)
@@ -7,9 +7,10 @@ A simple 2D molecular dynamics simulation of two particles interacting
 via the Lennard-Jones potential in a rectangular box with elastic walls.
 """
 
+import copy
+import math
 import sys
 import numpy as np
-import matplotlib.pyplot as plt
 from typing import Tuple, List, Optional
 
 # Fix encoding for Windows console (but not when running under pytest or in tests)
@@ -37,6 +38,33 @@ if sys.platform == 'win32' and 'pytest' not in sys.modules and 'unittest' not in
             # If wrapping fails, just continue without encoding fix
             pass
 
+# Numba is optional: without it the compiled kernels below run as plain Python
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Optional Cython build of the step kernel (python setup.py build_ext --inplace)
+try:
+    try:
+        from ._md_kernels import (verlet_step as _cy_verlet_step,
+                                  verlet_step_one_mobile as _cy_verlet_step_one_mobile,
+                                  step_kernel as _cy_step_kernel)
+    except ImportError:
+        from _md_kernels import (verlet_step as _cy_verlet_step,
+                                 verlet_step_one_mobile as _cy_verlet_step_one_mobile,
+                                 step_kernel as _cy_step_kernel)
+    CYTHON_AVAILABLE = True
+except ImportError:
+    CYTHON_AVAILABLE = False
+
 
 class Particle:
     """
@@ -53,6 +81,11 @@ class Particle:
         mass (float): Particle mass in atomic mass units (amu)
         force (np.ndarray): Current force acting on particle in kcal/(mol*Angstrom)
         is_fixed (bool): If True, particle doesn't move (fixed in space)
+
+    Once a particle is added to a TwoParticleMD simulation, position,
+    velocity, force, mass and is_fixed are bound to the simulation's
+    contiguous state arrays; assigning to them writes into that state in
+    place, so the integrator always sees the current values.
     """
 
     def __init__(self, position: np.ndarray, velocity: np.ndarray,
@@ -66,11 +99,78 @@ class Particle:
             mass: Particle mass (default: 1.0 amu)
             is_fixed: If True, particle is fixed in space (default: False)
         """
-        self.position = np.array(position, dtype=float)
-        self.velocity = np.array(velocity, dtype=float)
-        self.mass = mass
-        self.force = np.zeros(2)  # Force will be calculated during simulation
-        self.is_fixed = is_fixed
+        self._position = np.array(position, dtype=float)
+        self._velocity = np.array(velocity, dtype=float)
+        self._mass = np.array([mass], dtype=float)
+        self._force = np.zeros(2)  # Force will be calculated during simulation
+        self._is_fixed = np.array([is_fixed], dtype=np.uint8)
+        self._sim = None
+        self._index = -1
+
+    def _attach(self, sim, index: int) -> None:
+        """Bind this particle to row `index` of a simulation's SoA state."""
+        sim._pos[index] = self._position
+        sim._vel[index] = self._velocity
+        sim._mass[index] = self._mass[0]
+        sim._is_fixed[index] = self._is_fixed[0]
+        self._position = sim._pos[index]
+        self._velocity = sim._vel[index]
+        self._force = sim._force[index]
+        # One-element views, so scalar updates also reach the simulation
+        self._mass = sim._mass[index:index + 1]
+        self._is_fixed = sim._is_fixed[index:index + 1]
+        self._sim = sim
+        self._index = index
+
+    @property
+    def position(self) -> np.ndarray:
+        """2D position vector [x, y] in Angstroms."""
+        return self._position
+
+    @position.setter
+    def position(self, value: np.ndarray) -> None:
+        self._position[:] = value
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """2D velocity vector [vx, vy] in Angstroms/fs."""
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, value: np.ndarray) -> None:
+        self._velocity[:] = value
+
+    @property
+    def mass(self) -> float:
+        """Particle mass in amu."""
+        return float(self._mass[0])
+
+    @mass.setter
+    def mass(self, value: float) -> None:
+        self._mass[0] = value
+        if self._sim is not None:
+            # Keep the cached acceleration consistent with the new mass
+            self._sim._accel[self._index] = self._force / value
+
+    @property
+    def is_fixed(self) -> bool:
+        """True if the particle is fixed in space."""
+        return bool(self._is_fixed[0])
+
+    @is_fixed.setter
+    def is_fixed(self, value: bool) -> None:
+        self._is_fixed[0] = value
+        if self._sim is not None:
+            self._sim._update_mobile_index()
+
+    @property
+    def force(self) -> np.ndarray:
+        """Current force acting on particle in kcal/(mol*Angstrom)."""
+        return self._force
+
+    @force.setter
+    def force(self, value: np.ndarray) -> None:
+        self._force[:] = value
 
     @property
     def kinetic_energy(self) -> float:
@@ -86,8 +186,9 @@ class Particle:
         # Fixed particles have no kinetic energy
         if self.is_fixed:
             return 0.0
-        # np.dot(v, v) gives v^2 = vx^2 + vy^2
-        return 0.5 * self.mass * np.dot(self.velocity, self.velocity)
+        # v^2 = vx^2 + vy^2 (scalar math is much cheaper than np.dot on 2 elements)
+        vx, vy = self.velocity[0], self.velocity[1]
+        return 0.5 * self.mass * (vx * vx + vy * vy)
 
     def __repr__(self) -> str:
         """String representation for debugging."""
@@ -128,9 +229,33 @@ class LennardJonesPotential:
             epsilon: Depth of potential well (default: 1.0 kcal/mol)
             sigma: Zero-crossing distance (default: 1.0 Angstrom)
         """
+        # The setters also compute the derived constants used per call
         self.epsilon = epsilon
         self.sigma = sigma
 
+    @property
+    def epsilon(self) -> float:
+        """Depth of the potential well in kcal/mol."""
+        return self._epsilon
+
+    @epsilon.setter
+    def epsilon(self, value: float) -> None:
+        self._epsilon = value
+        self._4eps = 4.0 * value
+        self._24eps = 24.0 * value
+
+    @property
+    def sigma(self) -> float:
+        """Zero-crossing distance in Angstroms."""
+        return self._sigma
+
+    @sigma.setter
+    def sigma(self, value: float) -> None:
+        self._sigma = value
+        self._sigma2 = value * value
+        self._sigma6 = self._sigma2 * self._sigma2 * self._sigma2
+        self._sigma12 = self._sigma6 * self._sigma6
+
     def potential(self, r: float) -> float:
         """
         Calculate the Lennard-Jones potential energy at distance r.
@@ -138,20 +263,24 @@ class LennardJonesPotential:
         U(r) = 4*epsilon * [(sigma/r)^12 - (sigma/r)^6]
 
         Args:
-            r: Distance between particles (scalar)
+            r: Distance between particles (scalar or array)
 
         Returns:
-            Potential energy in kcal/mol
+            Potential energy in kcal/mol (array for array input)
         """
+        if isinstance(r, np.ndarray):
+            return self.potential_from_r2(r * r)
+
         # Avoid division by zero
         if r < 1e-10:
             return np.inf
 
-        # Calculate (sigma/r)^6 once to avoid redundant computation
-        sr6 = (self.sigma / r) ** 6
+        # 1/r^6 from multiplications only (no pow)
+        r2 = r * r
+        inv_r6 = 1.0 / (r2 * r2 * r2)
 
-        # LJ potential: repulsive term (sr6^2) minus attractive term (sr6)
-        return 4.0 * self.epsilon * (sr6 ** 2 - sr6)
+        # LJ potential: repulsive term (sigma^12/r^12) minus attractive term (sigma^6/r^6)
+        return self._4eps * inv_r6 * (self._sigma12 * inv_r6 - self._sigma6)
 
     def force_magnitude(self, r: float) -> float:
         """
@@ -165,21 +294,70 @@ class LennardJonesPotential:
         Positive F means repulsive (push apart), negative means attractive (pull together)
 
         Args:
-            r: Distance between particles
+            r: Distance between particles (scalar or array)
 
         Returns:
             Force magnitude (positive = repulsive, negative = attractive)
         """
+        # F(r) = r * (F/r), evaluated from r^2 (returns 0 at r=0)
+        if isinstance(r, np.ndarray):
+            return r * self._force_over_r_array(r * r)
+        return r * self.force_over_r_from_r2(r * r)
+
+    def force_over_r_from_r2(self, r2: float) -> float:
+        """
+        Calculate F(r)/r from the squared distance r2 = r^2.
+
+        Working in r^2 avoids the square root and extra divisions:
+            F(r)/r = 24*epsilon/r^2 * [2*(sigma^2/r^2)^6 - (sigma^2/r^2)^3]
+
+        Multiplying this factor by the displacement (dx, dy) gives the force
+        vector directly.
+
+        Args:
+            r2: Squared distance between particles
+
+        Returns:
+            Force magnitude divided by distance
+        """
         # Avoid division by zero
-        if r < 1e-10:
+        if r2 < 1e-20:
             return 0.0  # At r=0, we cap the force to avoid infinities
 
-        # Calculate (sigma/r)^6 once
-        sr6 = (self.sigma / r) ** 6
+        inv_r2 = 1.0 / r2
+        sr2 = self._sigma2 * inv_r2
+        sr6 = sr2 * sr2 * sr2
 
-        # Force magnitude from derivative of LJ potential
         # Factor of 24 comes from: d/dr[(sigma/r)^12] = -12*sigma^12/r^13
-        return 24.0 * self.epsilon / r * (2.0 * sr6 ** 2 - sr6)
+        return self._24eps * inv_r2 * (2.0 * sr6 * sr6 - sr6)
+
+    def _force_over_r_array(self, r2: np.ndarray) -> np.ndarray:
+        """F(r)/r for an array of squared distances (0 where r < 1e-10)."""
+        with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+            inv_r2 = 1.0 / r2
+            sr2 = self._sigma2 * inv_r2
+            sr6 = sr2 * sr2 * sr2
+            f_over_r = self._24eps * inv_r2 * (2.0 * sr6 * sr6 - sr6)
+        return np.where(r2 < 1e-20, 0.0, f_over_r)
+
+    def potential_from_r2(self, r2: np.ndarray) -> np.ndarray:
+        """
+        Calculate the potential energy for an array of squared distances.
+
+        Vectorized counterpart of potential() for whole trajectories:
+            U = 4*epsilon * [sigma^12/r^12 - sigma^6/r^6]
+
+        Args:
+            r2: Squared distances (any shape)
+
+        Returns:
+            Potential energies in kcal/mol, inf where r < 1e-10
+        """
+        r2 = np.asarray(r2, dtype=np.float64)
+        with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+            inv_r6 = 1.0 / (r2 * r2 * r2)
+            pe = self._4eps * inv_r6 * (self._sigma12 * inv_r6 - self._sigma6)
+        return np.where(r2 < 1e-20, np.inf, pe)
 
     def force_vector(self, r_vector: np.ndarray) -> np.ndarray:
         """
@@ -192,24 +370,239 @@ class LennardJonesPotential:
         where r_vector = position1 - position2
 
         Args:
-            r_vector: Displacement vector from particle 2 to particle 1 (2D)
+            r_vector: Displacement vector from particle 2 to particle 1 (2D),
+                      or an (N, 2) array of displacements
 
         Returns:
             Force vector acting on particle 1 (Newton's 3rd law: force on
-            particle 2 is the negative of this)
+            particle 2 is the negative of this); (N, 2) for batched input
         """
-        # Calculate distance (magnitude of displacement vector)
-        r = np.linalg.norm(r_vector)
+        if getattr(r_vector, 'ndim', 1) > 1:
+            # Batch: one F/r per row, broadcast over the displacements
+            r2 = np.einsum('ij,ij->i', r_vector, r_vector)
+            return self._force_over_r_array(r2)[:, None] * r_vector
 
-        # Avoid division by zero
-        if r < 1e-10:
-            return np.zeros(2)  # 2D force vector
+        # Squared distance; no square root is needed for the force vector
+        dx, dy = r_vector[0], r_vector[1]
+        r2 = dx * dx + dy * dy
+
+        # Force vector = (F/r) * displacement (zero at r=0)
+        f_over_r = self.force_over_r_from_r2(r2)
+        return np.array([f_over_r * dx, f_over_r * dy])
+
+    def force_array(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Calculate the total LJ force on every particle.
+
+        All pairs are evaluated at once by broadcasting, using the same r^2
+        form as force_over_r_from_r2. This is O(N^2) in time and memory,
+        which is ideal for small N (the two-particle simulation uses it
+        with N=2). For large N, replace the all-pairs displacement with a
+        neighbor (Verlet) list or cell list: only pairs closer than a
+        cutoff need to be evaluated, and the per-pair math stays the same.
+
+        Args:
+            positions: (N, 2) array of particle positions
+
+        Returns:
+            (N, 2) array of forces; row i is the total force on particle i
+        """
+        positions = np.asarray(positions, dtype=float)
+
+        # diff[i, j] = r_i - r_j
+        diff = positions[:, None, :] - positions[None, :, :]
+        r2 = np.einsum('ijk,ijk->ij', diff, diff)
+
+        # Exclude self-pairs (and overlapping particles) like the scalar path
+        overlap = r2 < 1e-20
+        inv_r2 = 1.0 / np.where(overlap, 1.0, r2)
+        sr6 = (self._sigma2 * inv_r2) ** 3
+        f_over_r = self._24eps * inv_r2 * (2.0 * sr6 * sr6 - sr6)
+        f_over_r[overlap] = 0.0
+
+        # Sum pair contributions: F_i = sum_j (F/r)_ij * (r_i - r_j)
+        return np.einsum('ij,ijk->ik', f_over_r, diff)
+
+
+@njit(fastmath=True)
+def _lj_force_2d(dx, dy, epsilon, sigma):
+    """
+    Lennard-Jones force on particle 1 for displacement (dx, dy) = r1 - r2.
+
+    Uses the r^2 form F/r = 24*eps/r^2 * [2*(sigma/r)^12 - (sigma/r)^6],
+    so no square root is needed.
+
+    Returns:
+        Tuple (fx, fy); (0, 0) when the particles overlap
+    """
+    r2 = dx * dx + dy * dy
+    if r2 < 1e-20:
+        return 0.0, 0.0
+    inv_r2 = 1.0 / r2
+    sr2 = sigma * sigma * inv_r2
+    sr6 = sr2 * sr2 * sr2
+    f_over_r = 24.0 * epsilon * inv_r2 * (2.0 * sr6 * sr6 - sr6)
+    return f_over_r * dx, f_over_r * dy
+
+
+@njit(fastmath=True)
+def _reflect_walls(pos, vel, k, box_w, box_h):
+    """
+    Elastic wall collisions for particle k (compiled).
 
-        # Unit vector pointing from particle 2 to particle 1
-        r_hat = r_vector / r
+    Clamps the position to the box and points the velocity component back
+    inside. Collisions are rare, so one combined interior test skips the
+    per-wall checks on almost every step.
 
-        # Force vector = magnitude * direction
-        return self.force_magnitude(r) * r_hat
+    Returns:
+        True if the particle hit at least one wall
+    """
+    if 0.0 < pos[k, 0] < box_w and 0.0 < pos[k, 1] < box_h:
+        return False
+    collided = False
+    if pos[k, 0] <= 0.0:
+        pos[k, 0] = 0.0
+        vel[k, 0] = abs(vel[k, 0])  # Bounce right
+        collided = True
+    elif pos[k, 0] >= box_w:
+        pos[k, 0] = box_w
+        vel[k, 0] = -abs(vel[k, 0])  # Bounce left
+        collided = True
+    if pos[k, 1] <= 0.0:
+        pos[k, 1] = 0.0
+        vel[k, 1] = abs(vel[k, 1])  # Bounce up
+        collided = True
+    elif pos[k, 1] >= box_h:
+        pos[k, 1] = box_h
+        vel[k, 1] = -abs(vel[k, 1])  # Bounce down
+        collided = True
+    return collided
+
+
+@njit(fastmath=True)
+def _verlet_step(pos, vel, force, accel, mass, is_fixed, box_w, box_h, dt,
+                 epsilon, sigma, coll_counts):
+    """
+    One Velocity Verlet step for two particles (compiled).
+
+    Same algorithm as described in TwoParticleMD.step(), fused into one
+    function on plain arrays: position update, elastic wall collisions,
+    LJ force at the new positions, velocity update. Forces are evaluated
+    once per step: the new acceleration is stored in accel and serves as
+    the old acceleration of the next step. All arrays are updated in place.
+
+    Args:
+        pos, vel, force, accel: (2, 2) arrays, one row per particle
+        mass: (2,) particle masses
+        is_fixed: (2,) uint8 flags, nonzero for fixed particles
+        box_w, box_h: Box width and height
+        dt: Time step
+        epsilon, sigma: Lennard-Jones parameters
+        coll_counts: (2,) int64 wall collision counters
+    """
+    half_dt2 = 0.5 * dt * dt
+
+    # Stage 1: position update (old accelerations from the previous step)
+    # and elastic wall collisions
+    for k in range(2):
+        if is_fixed[k]:
+            continue
+        pos[k, 0] += vel[k, 0] * dt + half_dt2 * accel[k, 0]
+        pos[k, 1] += vel[k, 1] * dt + half_dt2 * accel[k, 1]
+        if _reflect_walls(pos, vel, k, box_w, box_h):
+            coll_counts[k] += 1  # Counted once per particle per step
+
+    # Forces at the new positions (Newton's 3rd law for particle 2)
+    fx, fy = _lj_force_2d(pos[0, 0] - pos[1, 0], pos[0, 1] - pos[1, 1],
+                          epsilon, sigma)
+    force[0, 0] = fx
+    force[0, 1] = fy
+    force[1, 0] = -fx
+    force[1, 1] = -fy
+
+    # Stage 2: velocity update with the average acceleration, then keep
+    # the new acceleration for the next step
+    for k in range(2):
+        new_ax = force[k, 0] / mass[k]
+        new_ay = force[k, 1] / mass[k]
+        if not is_fixed[k]:
+            vel[k, 0] += 0.5 * (accel[k, 0] + new_ax) * dt
+            vel[k, 1] += 0.5 * (accel[k, 1] + new_ay) * dt
+        accel[k, 0] = new_ax
+        accel[k, 1] = new_ay
+
+
+@njit(fastmath=True)
+def _verlet_step_one_mobile(pos, vel, force, accel, mass, mobile, box_w, box_h,
+                            dt, epsilon, sigma, coll_counts):
+    """
+    _verlet_step specialized for one fixed particle (compiled).
+
+    Only particle `mobile` (0 or 1) is integrated. The other one never
+    moves, so its position, velocity and acceleration updates and all
+    is_fixed checks are skipped; its force row is still kept up to date.
+    Other arguments as for _verlet_step.
+    """
+    k = mobile
+    half_dt2 = 0.5 * dt * dt
+
+    pos[k, 0] += vel[k, 0] * dt + half_dt2 * accel[k, 0]
+    pos[k, 1] += vel[k, 1] * dt + half_dt2 * accel[k, 1]
+    if _reflect_walls(pos, vel, k, box_w, box_h):
+        coll_counts[k] += 1
+
+    fx, fy = _lj_force_2d(pos[0, 0] - pos[1, 0], pos[0, 1] - pos[1, 1],
+                          epsilon, sigma)
+    force[0, 0] = fx
+    force[0, 1] = fy
+    force[1, 0] = -fx
+    force[1, 1] = -fy
+
+    new_ax = force[k, 0] / mass[k]
+    new_ay = force[k, 1] / mass[k]
+    vel[k, 0] += 0.5 * (accel[k, 0] + new_ax) * dt
+    vel[k, 1] += 0.5 * (accel[k, 1] + new_ay) * dt
+    accel[k, 0] = new_ax
+    accel[k, 1] = new_ay
+
+
+@njit(fastmath=True)
+def _step_kernel(pos, vel, force, accel, mass, is_fixed, box_w, box_h, dt,
+                 epsilon, sigma, n_steps, coll_counts):
+    """Advance n_steps compiled Verlet steps (see _verlet_step for args)."""
+    if is_fixed[0] != is_fixed[1]:
+        # Exactly one particle moves: use the specialized step
+        mobile = 1 if is_fixed[0] else 0
+        for _ in range(n_steps):
+            _verlet_step_one_mobile(pos, vel, force, accel, mass, mobile,
+                                    box_w, box_h, dt, epsilon, sigma,
+                                    coll_counts)
+    else:
+        for _ in range(n_steps):
+            _verlet_step(pos, vel, force, accel, mass, is_fixed, box_w, box_h,
+                         dt, epsilon, sigma, coll_counts)
+
+
+# Kernels used by TwoParticleMD.step() and run_numba(): the ahead-of-time
+# compiled Cython versions when built (no JIT warm-up), otherwise the Numba ones
+if CYTHON_AVAILABLE:
+    _step_impl = _cy_verlet_step
+    _step_one_mobile_impl = _cy_verlet_step_one_mobile
+    _run_impl = _cy_step_kernel
+else:
+    _step_impl = _verlet_step
+    _step_one_mobile_impl = _verlet_step_one_mobile
+    _run_impl = _step_kernel
+
+
+# Target number of history samples when run() chooses record_interval
+MAX_AUTO_RECORDS = 10000
+
+
+# Quantities recorded in TwoParticleMD.history
+HISTORY_KEYS = ('time', 'pos1', 'pos2', 'vel1', 'vel2',
+                'kinetic', 'potential', 'total',
+                'wall_collisions_1', 'wall_collisions_2')
 
 
 class TwoParticleMD:
@@ -238,7 +631,7 @@ class TwoParticleMD:
         dt (float): Time step in femtoseconds
         time (float): Current simulation time
         box_size (tuple): (width, height) of the 2D box in Angstroms
-        history (dict): Stores trajectory and energy data
+        history (dict): Stores trajectory and energy data (arrays after run())
     """
 
     def __init__(self,
@@ -264,94 +657,125 @@ class TwoParticleMD:
         self.time = 0.0
         self.box_size = box_size
 
-        # History storage for analysis and visualization
-        # Each list will store values at each time step
-        self.history = {
-            'time': [],
-            'pos1': [],        # Particle 1 positions
-            'pos2': [],        # Particle 2 positions
-            'vel1': [],        # Particle 1 velocities
-            'vel2': [],        # Particle 2 velocities
-            'kinetic': [],     # Kinetic energy
-            'potential': [],   # Potential energy
-            'total': [],       # Total energy (should be conserved!)
-            'wall_collisions_1': [],  # Particle 1 wall collisions
-            'wall_collisions_2': []   # Particle 2 wall collisions
-        }
+        # Contiguous per-particle state (row 0 = particle 1, row 1 = particle 2)
+        # used by the compiled step kernel
+        self._pos = np.empty((2, 2))
+        self._vel = np.empty((2, 2))
+        self._force = np.zeros((2, 2))
+        self._accel = np.zeros((2, 2))  # force / mass, cached between steps
+        self._mass = np.empty(2)
+        self._is_fixed = np.zeros(2, dtype=np.uint8)
+        self._coll_counts = np.zeros(2, dtype=np.int64)
+
+        # Particle state becomes views into those rows, so both the kernel
+        # and code using the particles see the same state
+        particle1._attach(self, 0)
+        particle2._attach(self, 1)
+        self._update_mobile_index()
 
-        self.wall_collision_count_1 = 0
-        self.wall_collision_count_2 = 0
+        # History storage for analysis and visualization
+        # Starts as lists (so callers can append to them directly); each
+        # run() records into preallocated arrays filled by index and then
+        # replaces the dict with views of the recorded rows
+        self._history = {key: [] for key in HISTORY_KEYS}
+        self._rec_idx = 0
+        self._hist_buffers = None
 
         # Calculate initial forces
         self._calculate_forces()
 
-    def _calculate_forces(self) -> None:
+    def _update_mobile_index(self) -> None:
         """
-        Calculate forces on both particles based on their current positions.
+        Set the index of the only mobile particle when the other one is
+        fixed (step() then uses the specialized kernel), otherwise -1.
+        """
+        fixed1, fixed2 = self._is_fixed
+        if fixed1 != fixed2:
+            self._mobile_index = 1 if fixed1 else 0
+        else:
+            self._mobile_index = -1
 
-        This is a private method (indicated by leading underscore) called
-        internally during the simulation.
+    @property
+    def history(self) -> dict:
+        """
+        Trajectory and energy data keyed by quantity.
 
-        Newton's 3rd Law: F_12 = -F_21
-        If particle 1 feels force F from particle 2, then particle 2 feels -F
+        Lists before the first run(); afterwards NumPy views of the
+        recorded rows of the preallocated history buffers. The same dict
+        object is returned until the next run() replaces it, so entries
+        assigned by callers persist until then; the next run() copies the
+        HISTORY_KEYS entries into its buffers and drops any other keys.
         """
-        # Displacement vector from particle 2 to particle 1
-        r_vector = self.particle1.position - self.particle2.position
+        return self._history
 
-        # Calculate force on particle 1
-        force_on_1 = self.potential.force_vector(r_vector)
+    def _publish_history(self) -> None:
+        """Expose the recorded rows of the history buffers as self._history."""
+        n = self._rec_idx
+        self._history = {key: buf[:n] for key, buf in self._hist_buffers.items()}
+
+    @property
+    def wall_collision_count_1(self) -> int:
+        """Number of steps in which particle 1 hit a wall."""
+        return int(self._coll_counts[0])
+
+    @wall_collision_count_1.setter
+    def wall_collision_count_1(self, value: int) -> None:
+        self._coll_counts[0] = value
+
+    @property
+    def wall_collision_count_2(self) -> int:
+        """Number of steps in which particle 2 hit a wall."""
+        return int(self._coll_counts[1])
 
-        # Apply Newton's 3rd law: force on particle 2 is opposite
-        self.particle1.force = force_on_1
-        self.particle2.force = -force_on_1
+    @wall_collision_count_2.setter
+    def wall_collision_count_2(self, value: int) -> None:
+        self._coll_counts[1] = value
 
-    def _handle_wall_collisions(self, particle, collision_counter_attr: str) -> None:
+    def kernel_state(self) -> Tuple[np.ndarray, ...]:
         """
-        Handle elastic collisions with the box walls for a given particle.
+        Return the contiguous state arrays used by the compiled kernels.
 
-        When a particle hits a wall, we reverse the appropriate
-        velocity component (elastic collision). This conserves kinetic energy.
+        External kernels (such as md_kernel.run_md in the Streamlit app) can
+        advance the simulation by updating these arrays in place; the caller
+        is then responsible for advancing `time` accordingly.
 
-        Box boundaries: x in [0, box_width], y in [0, box_height]
+        Returns:
+            Tuple (pos, vel, force, accel, mass, is_fixed, coll_counts) of
+            live arrays: (2, 2) float64 state rows per particle, (2,)
+            masses, (2,) uint8 fixed flags and (2,) int64 collision counts
+        """
+        return (self._pos, self._vel, self._force, self._accel,
+                self._mass, self._is_fixed, self._coll_counts)
 
-        Args:
-            particle: The particle to check for wall collisions
-            collision_counter_attr: Name of the collision counter attribute
-                                   ('wall_collision_count_1' or 'wall_collision_count_2')
+    def __deepcopy__(self, memo) -> 'TwoParticleMD':
         """
-        # Skip if particle is fixed
-        if particle.is_fixed:
-            return
+        Deep copy whose particles stay bound to the copy's state arrays.
 
-        pos = particle.position
-        vel = particle.velocity
-        width, height = self.box_size
+        A plain deep copy would give the copied particles stand-alone
+        arrays instead of views into the copied _pos/_vel/_force rows.
+        """
+        new = self.__class__.__new__(self.__class__)
+        memo[id(self)] = new
+        for key, value in self.__dict__.items():
+            new.__dict__[key] = copy.deepcopy(value, memo)
+        new.particle1._attach(new, 0)
+        new.particle2._attach(new, 1)
+        return new
+
+    def _calculate_forces(self) -> None:
+        """
+        Calculate forces on both particles based on their current positions.
 
-        collision_occurred = False
-
-        # Check left and right walls (x-direction)
-        if pos[0] <= 0:
-            pos[0] = 0
-            vel[0] = abs(vel[0])  # Bounce right
-            collision_occurred = True
-        elif pos[0] >= width:
-            pos[0] = width
-            vel[0] = -abs(vel[0])  # Bounce left
-            collision_occurred = True
-
-        # Check bottom and top walls (y-direction)
-        if pos[1] <= 0:
-            pos[1] = 0
-            vel[1] = abs(vel[1])  # Bounce up
-            collision_occurred = True
-        elif pos[1] >= height:
-            pos[1] = height
-            vel[1] = -abs(vel[1])  # Bounce down
-            collision_occurred = True
-
-        if collision_occurred:
-            current_count = getattr(self, collision_counter_attr)
-            setattr(self, collision_counter_attr, current_count + 1)
+        This is a private method (indicated by leading underscore) called
+        internally during the simulation.
+
+        Newton's 3rd Law: F_12 = -F_21
+        If particle 1 feels force F from particle 2, then particle 2 feels -F
+        """
+        # Pair force for both particles at once (rows sum to zero: Newton's
+        # 3rd law). Written in place: particle forces are views into _force.
+        self._force[:] = self.potential.force_array(self._pos)
+        np.divide(self._force, self._mass[:, None], out=self._accel)
 
     def step(self) -> None:
         """
@@ -361,49 +785,31 @@ class TwoParticleMD:
         Stage 1: Update positions using current velocities and accelerations
         Stage 2: Update velocities using average of old and new accelerations
 
-        After updating, we check for wall collisions and handle them.
+        After updating positions, we check for wall collisions and handle them.
 
-        This method is the heart of the MD simulation!
-        """
-        # Store old accelerations (a = F/m from Newton's 2nd law)
-        old_accel1 = self.particle1.force / self.particle1.mass
-        old_accel2 = self.particle2.force / self.particle2.mass
-
-        # Stage 1: Update positions
-        # New position = old position + velocity*dt + 0.5*acceleration*dt^2
-        if not self.particle1.is_fixed:
-            self.particle1.position += (self.particle1.velocity * self.dt +
-                                        0.5 * old_accel1 * self.dt ** 2)
+        The whole step runs in one compiled kernel (the Cython verlet_step
+        if built, otherwise the Numba _verlet_step) operating on the
+        simulation's contiguous state arrays. With exactly one fixed
+        particle, a specialized kernel integrates only the mobile one.
 
-        if not self.particle2.is_fixed:
-            self.particle2.position += (self.particle2.velocity * self.dt +
-                                        0.5 * old_accel2 * self.dt ** 2)
-
-        # Handle wall collisions (elastic bounces) for both particles
-        # Note: Wall collision handling does introduce small numerical errors because:
-        # 1. We clamp positions to boundaries (pos = 0 or pos = width/height)
-        # 2. This slightly violates energy conservation (particle may have penetrated wall)
-        # 3. However, errors are O(dt^2) and acceptable for educational purposes
-        # 4. For production code, consider: collision detection before position update,
-        #    or more sophisticated boundary conditions (e.g., reflective boundaries with
-        #    exact collision time calculation)
-        self._handle_wall_collisions(self.particle1, 'wall_collision_count_1')
-        self._handle_wall_collisions(self.particle2, 'wall_collision_count_2')
-
-        # Calculate forces at new positions
-        self._calculate_forces()
-
-        # New accelerations at updated positions
-        new_accel1 = self.particle1.force / self.particle1.mass
-        new_accel2 = self.particle2.force / self.particle2.mass
-
-        # Stage 2: Update velocities using average acceleration
-        # New velocity = old velocity + 0.5*(old acceleration + new acceleration)*dt
-        if not self.particle1.is_fixed:
-            self.particle1.velocity += 0.5 * (old_accel1 + new_accel1) * self.dt
-
-        if not self.particle2.is_fixed:
-            self.particle2.velocity += 0.5 * (old_accel2 + new_accel2) * self.dt
+        Note: Wall collision handling does introduce small numerical errors
+        because positions are clamped to the boundaries (the particle may
+        have penetrated the wall). The errors are O(dt^2) and acceptable for
+        educational purposes; production code would compute the exact
+        collision time instead.
+        """
+        width, height = self.box_size
+        if self._mobile_index >= 0:
+            _step_one_mobile_impl(self._pos, self._vel, self._force,
+                                  self._accel, self._mass, self._mobile_index,
+                                  float(width), float(height), self.dt,
+                                  self.potential.epsilon, self.potential.sigma,
+                                  self._coll_counts)
+        else:
+            _step_impl(self._pos, self._vel, self._force, self._accel,
+                       self._mass, self._is_fixed, float(width), float(height),
+                       self.dt, self.potential.epsilon, self.potential.sigma,
+                       self._coll_counts)
 
         # Increment simulation time
         self.time += self.dt
@@ -424,12 +830,12 @@ class TwoParticleMD:
         ke = self.particle1.kinetic_energy + self.particle2.kinetic_energy
 
         # Potential energy: depends on distance between particles
-        r_vector = self.particle1.position - self.particle2.position
-        # Calculate distance using Euclidean norm: r = sqrt(dx^2 + dy^2)
-        # np.linalg.norm computes the L2 norm (Euclidean distance) of the vector
-        # This is the scalar distance needed for the Lennard-Jones potential U(r)
-        # Alternative: r = np.sqrt(np.sum(r_vector**2)) or r = np.sqrt(r_vector @ r_vector)
-        r = np.linalg.norm(r_vector)
+        # Calculate distance r = sqrt(dx^2 + dy^2) with scalar math; on
+        # 2-element arrays np.linalg.norm costs far more than the arithmetic
+        pos1, pos2 = self.particle1.position, self.particle2.position
+        dx = pos1[0] - pos2[0]
+        dy = pos1[1] - pos2[1]
+        r = math.sqrt(dx * dx + dy * dy)
         pe = self.potential.potential(r)
 
         # Total energy (should be conserved in microcanonical ensemble)
@@ -437,40 +843,154 @@ class TwoParticleMD:
 
         return ke, pe, total
 
-    def _record_state(self) -> None:
+    def _reserve_history(self, n_new: int, store_dtype=np.float64) -> None:
+        """
+        Allocate history buffers with room for n_new more records.
+
+        Records already present (from appended lists or an earlier run)
+        are copied to the front of the new buffers.
+
+        Args:
+            n_new: Number of additional records
+            store_dtype: dtype of the position/velocity buffers
+        """
+        old = self.history
+        n_old = len(old['time'])
+        n = n_old + n_new
+        buffers = {
+            'time': np.empty(n),
+            'pos1': np.empty((n, 2), dtype=store_dtype),
+            'pos2': np.empty((n, 2), dtype=store_dtype),
+            'vel1': np.empty((n, 2), dtype=store_dtype),
+            'vel2': np.empty((n, 2), dtype=store_dtype),
+            'kinetic': np.empty(n),
+            'potential': np.empty(n),
+            'total': np.empty(n),
+            'wall_collisions_1': np.empty(n, dtype=np.int64),
+            'wall_collisions_2': np.empty(n, dtype=np.int64),
+        }
+        if n_old:
+            for key, buf in buffers.items():
+                buf[:n_old] = old[key]
+        self._hist_buffers = buffers
+        self._rec_idx = n_old
+
+    def _record_state(self, energies: bool = True) -> None:
         """
         Record current state to history for later analysis.
 
-        This is called after each time step to build up trajectory data.
+        Writes one row of the buffers allocated by _reserve_history.
+
+        Args:
+            energies: Also compute and write the energies. run() passes
+                     False and fills them afterwards with _record_energies.
         """
-        ke, pe, total = self.get_energies()
+        i = self._rec_idx
+        buffers = self._hist_buffers
+        if energies:
+            ke, pe, total = self.get_energies()
+            buffers['kinetic'][i] = ke
+            buffers['potential'][i] = pe
+            buffers['total'][i] = total
+        buffers['time'][i] = self.time
+        buffers['pos1'][i] = self._pos[0]
+        buffers['pos2'][i] = self._pos[1]
+        buffers['vel1'][i] = self._vel[0]
+        buffers['vel2'][i] = self._vel[1]
+        buffers['wall_collisions_1'][i] = self._coll_counts[0]
+        buffers['wall_collisions_2'][i] = self._coll_counts[1]
+        self._rec_idx = i + 1
+
+    def _record_energies(self, start: int) -> None:
+        """
+        Fill the energies of records start.._rec_idx in one vectorized pass.
+
+        Uses the recorded float64 positions and velocities, so the values
+        match get_energies() at each recorded step.
+
+        Args:
+            start: Index of the first record without energies
+        """
+        buffers = self._hist_buffers
+        rows = slice(start, self._rec_idx)
+        vel1, vel2 = buffers['vel1'][rows], buffers['vel2'][rows]
+        d = buffers['pos1'][rows] - buffers['pos2'][rows]
+
+        # Fixed particles have no kinetic energy
+        ke = buffers['kinetic'][rows]
+        ke[:] = 0.0
+        if not self.particle1.is_fixed:
+            ke += 0.5 * self.particle1.mass * np.einsum('ij,ij->i', vel1, vel1)
+        if not self.particle2.is_fixed:
+            ke += 0.5 * self.particle2.mass * np.einsum('ij,ij->i', vel2, vel2)
 
-        self.history['time'].append(self.time)
-        self.history['pos1'].append(self.particle1.position.copy())
-        self.history['pos2'].append(self.particle2.position.copy())
-        self.history['vel1'].append(self.particle1.velocity.copy())
-        self.history['vel2'].append(self.particle2.velocity.copy())
-        self.history['kinetic'].append(ke)
-        self.history['potential'].append(pe)
-        self.history['total'].append(total)
-        self.history['wall_collisions_1'].append(self.wall_collision_count_1)
-        self.history['wall_collisions_2'].append(self.wall_collision_count_2)
+        buffers['potential'][rows] = self.potential.potential_from_r2(
+            np.einsum('ij,ij->i', d, d))
+        np.add(ke, buffers['potential'][rows], out=buffers['total'][rows])
 
-    def run(self, n_steps: int, record_interval: int = 1) -> None:
+    def run(self, n_steps: int, record_interval: Optional[int] = None,
+            store_dtype=np.float64, record: bool = True) -> None:
         """
         Run the simulation for a specified number of time steps.
 
         Args:
             n_steps: Number of time steps to simulate
-            record_interval: Record state every N steps (default: 1 = every step)
-                           Use larger values to save memory for long simulations
+            record_interval: Record state every N steps. The default (None)
+                           records every step for up to MAX_AUTO_RECORDS
+                           steps and otherwise picks an interval that keeps
+                           about MAX_AUTO_RECORDS samples. Pass 1 to record
+                           every step regardless of length.
+            store_dtype: dtype for the recorded positions and velocities
+                       (default: float64). np.float32 halves trajectory
+                       memory and is meant for visualization-only
+                       workflows; the integration itself and the recorded
+                       energies stay float64.
+            record: If False, history is not touched at all and the steps
+                  run in compiled chunks (see run_numba), one per progress
+                  milestone. Use this for parameter sweeps that only need
+                  the final state; energy statistics are not printed.
         """
+        if record_interval is None:
+            record_interval = max(1, n_steps // MAX_AUTO_RECORDS)
+            if record_interval > 1:
+                print(f"Recording every {record_interval} steps "
+                      f"(~{MAX_AUTO_RECORDS} samples)")
+
         print(f"Starting 2D box simulation for {n_steps} steps (dt={self.dt} fs)...")
         print(f"Total simulation time: {n_steps * self.dt:.3f} fs")
         print(f"Box size: {self.box_size[0]} x {self.box_size[1]} Angstroms")
 
+        # Progress is printed at every 10% milestone (only for long runs)
+        progress_stride = max(1, n_steps // 10)
+        next_milestone = progress_stride if n_steps >= 10 else n_steps + 1
+
+        if not record:
+            # No history: advance between milestones in single kernel calls
+            done = 0
+            while done < n_steps:
+                chunk = min(next_milestone, n_steps) - done
+                self.run_numba(chunk)
+                done += chunk
+                if done == next_milestone:
+                    print(f"Progress: {100 * done / n_steps:.0f}%")
+                    next_milestone += progress_stride
+
+            print("Simulation complete!")
+            print(f"Particle 1 wall collisions: {self.wall_collision_count_1}")
+            print(f"Particle 2 wall collisions: {self.wall_collision_count_2}")
+            return
+
+        # Preallocate history: the initial state plus one record per interval
+        self._reserve_history(n_steps // record_interval + 1, store_dtype)
+        first_record = self._rec_idx
+
+        # With float64 storage the energies are computed after the loop in
+        # one vectorized pass; reduced-precision storage keeps computing
+        # them per record from the float64 state
+        deferred = np.dtype(store_dtype) == np.float64
+
         # Record initial state
-        self._record_state()
+        self._record_state(energies=not deferred)
 
         # Main simulation loop
         for step in range(n_steps):
@@ -478,24 +998,50 @@ class TwoParticleMD:
 
             # Record state at specified intervals
             if (step + 1) % record_interval == 0:
-                self._record_state()
+                self._record_state(energies=not deferred)
 
             # Progress indicator for long simulations
-            if n_steps >= 10 and (step + 1) % (n_steps // 10) == 0:
+            if step + 1 == next_milestone:
                 progress = 100 * (step + 1) / n_steps
                 print(f"Progress: {progress:.0f}%")
+                next_milestone += progress_stride
+
+        if deferred:
+            self._record_energies(first_record)
+        self._publish_history()
 
         print("Simulation complete!")
         print(f"Particle 1 wall collisions: {self.wall_collision_count_1}")
         print(f"Particle 2 wall collisions: {self.wall_collision_count_2}")
         self._print_energy_statistics()
 
+    def run_numba(self, n_steps: int) -> None:
+        """
+        Advance the simulation by n_steps using the compiled kernel.
+
+        Same integrator as step(), but the whole loop runs inside one
+        compiled call (the Cython step_kernel if built, otherwise the Numba
+        _step_kernel) instead of one Python call per step.
+        Nothing is recorded to history and nothing is printed, which makes
+        this the fast path for long runs where only the final state matters.
+        Without Numba installed, the kernel runs as plain Python.
+
+        Args:
+            n_steps: Number of time steps to simulate
+        """
+        width, height = self.box_size
+        _run_impl(self._pos, self._vel, self._force, self._accel,
+                  self._mass, self._is_fixed, float(width), float(height),
+                  self.dt, self.potential.epsilon, self.potential.sigma,
+                  n_steps, self._coll_counts)
+        self.time += n_steps * self.dt
+
     def _print_energy_statistics(self) -> None:
         """Print statistics about energy conservation during the simulation."""
         if len(self.history['total']) < 2:
             return
 
-        total_energies = np.array(self.history['total'])
+        total_energies = np.asarray(self.history['total'])
         initial_energy = total_energies[0]
         final_energy = total_energies[-1]
         energy_drift = final_energy - initial_energy
@@ -521,13 +1067,16 @@ class TwoParticleMD:
         Shows the box boundaries and the paths of both particles with
         different colors.
         """
+        # Imported lazily so running simulations never loads matplotlib
+        import matplotlib.pyplot as plt
+
         if len(self.history['pos1']) == 0:
             print("No trajectory data to plot. Run simulation first!")
             return
 
         # Convert position lists to numpy arrays
-        pos1 = np.array(self.history['pos1'])
-        pos2 = np.array(self.history['pos2'])
+        pos1 = np.asarray(self.history['pos1'])
+        pos2 = np.asarray(self.history['pos2'])
 
         # Create 2D plot
         plt.figure(figsize=(10, 10))
@@ -579,13 +1128,15 @@ class TwoParticleMD:
 
         This is crucial for verifying energy conservation!
         """
+        import matplotlib.pyplot as plt
+
         if len(self.history['time']) == 0:
             print("No energy data to plot. Run simulation first!")
             return
 
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
 
-        time = np.array(self.history['time'])
+        time = np.asarray(self.history['time'])
 
         # Top plot: All energy components
         ax1.plot(time, self.history['kinetic'], 'b-', label='Kinetic Energy', linewidth=1.5)
@@ -598,7 +1149,7 @@ class TwoParticleMD:
         ax1.grid(True, alpha=0.3)
 
         # Bottom plot: Total energy deviation (zoomed in to see drift)
-        total_energy = np.array(self.history['total'])
+        total_energy = np.asarray(self.history['total'])
         initial_energy = total_energy[0]
         energy_deviation = total_energy - initial_energy
 
@@ -618,16 +1169,19 @@ class TwoParticleMD:
 
         This helps visualize oscillations and whether particles are bound or unbound.
         """
+        import matplotlib.pyplot as plt
+
         if len(self.history['pos1']) == 0:
             print("No trajectory data to plot. Run simulation first!")
             return
 
         # Calculate distances at each time step
-        pos1 = np.array(self.history['pos1'])
-        pos2 = np.array(self.history['pos2'])
+        pos1 = np.asarray(self.history['pos1'])
+        pos2 = np.asarray(self.history['pos2'])
 
-        # Distance between particles
-        distances = np.linalg.norm(pos1 - pos2, axis=1)
+        # Distance between particles: hypot is single-pass and overflow-safe,
+        # without the squared (N, 2) temporary of a norm over axis 1
+        distances = np.hypot(pos1[:, 0] - pos2[:, 0], pos1[:, 1] - pos2[:, 1])
 
         plt.figure(figsize=(12, 6))
         plt.plot(self.history['time'], distances, 'purple', linewidth=1.5)
@@ -663,7 +1217,7 @@ if __name__ == "__main__":
 
     # Set random seed for reproducibility
     random_seed = 42
-    np.random.seed(random_seed)
+    rng = np.random.default_rng(random_seed)
     print(f"Random seed: {random_seed}")
 
     # Lennard-Jones parameters for Argon-Argon interaction
@@ -681,14 +1235,20 @@ if __name__ == "__main__":
     # Ensure they start at least 2*sigma apart to avoid extreme forces
     min_separation = 2.0 * sigma
 
+    # Rejection sampling in batches: draw many candidate pairs at once and
+    # keep the first one that is far enough apart
+    upper = (box_size[0] - 2.0, box_size[1] - 2.0)
     while True:
         # Random positions within the box (with some margin from walls)
-        pos1 = np.random.uniform(2.0, box_size[0] - 2.0, size=2)
-        pos2 = np.random.uniform(2.0, box_size[1] - 2.0, size=2)
-
-        # Check if particles are far enough apart
-        separation = np.linalg.norm(pos1 - pos2)
-        if separation >= min_separation:
+        cand1 = rng.uniform(2.0, upper, size=(64, 2))
+        cand2 = rng.uniform(2.0, upper, size=(64, 2))
+
+        # Check which candidate pairs are far enough apart
+        separations = np.hypot(cand1[:, 0] - cand2[:, 0], cand1[:, 1] - cand2[:, 1])
+        ok = np.flatnonzero(separations >= min_separation)
+        if ok.size:
+            pos1, pos2 = cand1[ok[0]], cand2[ok[0]]
+            separation = separations[ok[0]]
             break
 
     print(f"Particle 1 starting position: [{pos1[0]:.2f}, {pos1[1]:.2f}]")
@@ -702,7 +1262,7 @@ if __name__ == "__main__":
     # Create particle 1
     particle1 = Particle(
         position=pos1,
-        velocity=initial_velocity.copy(),  # Use copy to avoid reference issues
+        velocity=initial_velocity,  # Particle stores its own copy
         mass=39.948,  # Argon mass in amu
         is_fixed=False
     )
@@ -9,9 +9,14 @@ This app provides an interactive interface to:
 
 import streamlit as st
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.express as px
+import matplotlib
+matplotlib.use("Agg")  # Render off-screen; Streamlit only needs the PNG
+from matplotlib.figure import Figure
+
+# Aggressive path simplification for the long trajectory/energy lines
+matplotlib.rcParams['path.simplify'] = True
+matplotlib.rcParams['path.simplify_threshold'] = 1.0
+matplotlib.rcParams['agg.path.chunksize'] = 10000
 import plotly.graph_objects as go
 import sys
 import os
@@ -22,25 +27,205 @@ if _src_dir not in sys.path:
     sys.path.insert(0, _src_dir)
 
 from md_simulation import Particle, LennardJonesPotential, TwoParticleMD
+# Ahead-of-time compiled kernel (python build_kernel.py) avoids the JIT
+# warm-up; fall back to the Numba-jitted version
+try:
+    from md_aot import run_md
+except ImportError:
+    from md_kernel import run_md
 
+# Number of kernel calls per run, i.e. progress bar updates
+PROGRESS_CHUNKS = 20
 
-def create_trajectory_figure(sim):
-    """Create trajectory plot and return the figure."""
-    if len(sim.history['pos1']) == 0:
-        return None
-    
-    pos1 = np.array(sim.history['pos1'])
-    pos2 = np.array(sim.history['pos2'])
-    
-    fig, ax = plt.subplots(figsize=(8, 8))
+# Figures kept alive per builder; each rerun with the same history
+# reuses its Figure instead of allocating a new one
+FIGURE_CACHE_ENTRIES = 4
+
+# Longest path drawn in the static plots; longer trajectories are decimated
+MAX_PLOT_POINTS = 5000
+
+
+def _decimate(arr, max_points=MAX_PLOT_POINTS):
+    """Return every stride-th row of arr, plus the last row, keeping at most max_points + 1."""
+    stride = -(-len(arr) // max_points)
+    if stride <= 1:
+        return arr
+    return np.concatenate((arr[::stride], arr[-1:]))
+
+
+@st.cache_resource(show_spinner=False)
+def _warm_jit():
+    """Compile run_md once per server process with a two-step dummy run.
+
+    The JIT compilation then happens while the page loads instead of on
+    the user's first click of Run Simulation.
+    """
+    pos = np.array([[5.0, 10.0], [15.0, 10.0]])
+    vel = np.zeros((2, 2))
+    force = np.zeros((2, 2))
+    accel = np.zeros((2, 2))
+    mass = np.ones(2)
+    is_fixed = np.zeros(2, dtype=np.uint8)
+    coll_counts = np.zeros(2, dtype=np.int64)
+    run_md(pos, vel, force, accel, mass, is_fixed, 0.238, 3.4, 20.0, 20.0, 1.0, 2,
+           coll_counts, np.empty((2, 2)), np.empty((2, 2)),
+           np.empty(2, dtype=np.int64), np.empty(2, dtype=np.int64),
+           np.empty(2), np.empty(2))
+
+
+_warm_jit()
+
+
+@st.cache_resource(show_spinner=False)
+def get_potential(epsilon, sigma):
+    """Return the shared LennardJonesPotential for (epsilon, sigma).
+
+    The potential precomputes its sigma powers, so one instance per
+    parameter pair is kept warm across reruns and sessions.
+    """
+    return LennardJonesPotential(epsilon=epsilon, sigma=sigma)
+
+
+def simulate(epsilon, sigma, box_w, box_h, dt, n_steps, seed,
+             mass1, v1x, v1y, fixed1, mass2, v2x, v2y, fixed2, progress=None):
+    """Run one simulation and return its history as a dict of arrays.
+
+    Args:
+        progress: Optional callback progress(steps_done, n_steps), called
+            after each of the PROGRESS_CHUNKS kernel calls
+
+    Returns:
+        Dict of the HISTORY_KEYS arrays except the velocities, which no
+        plot uses (initial state + one row per step)
+
+    If no candidate pair of initial positions is at least 2 sigma apart
+    (box too small for sigma), the best-separated pair is used; run_sim
+    warns about it.
+    """
+    # Random number generator (PCG64) for the initial positions
+    rng = np.random.default_rng(seed)
+
+    # Shared potential for these parameters
+    lj = get_potential(epsilon, sigma)
+
+    # Generate random positions with minimum separation: draw all
+    # candidate pairs at once and take the first one far enough apart,
+    # or the farthest apart if none is
+    min_separation = 2.0 * sigma
+    max_attempts = 100
+
+    # candidates[i] holds the pair (pos1, pos2) of attempt i
+    candidates = rng.uniform([sigma, sigma], [box_w - sigma, box_h - sigma],
+                             size=(max_attempts, 2, 2))
+    diffs = candidates[:, 0] - candidates[:, 1]
+    distances = np.sqrt(np.einsum('ij,ij->i', diffs, diffs))
+    ok = distances >= min_separation
+    best = np.argmax(ok) if ok.any() else np.argmax(distances)
+    pos1, pos2 = candidates[best]
+
+    # Create particles
+    particle1 = Particle(position=pos1, velocity=np.array([v1x, v1y]),
+                         mass=mass1, is_fixed=fixed1)
+    particle2 = Particle(position=pos2, velocity=np.array([v2x, v2y]),
+                         mass=mass2, is_fixed=fixed2)
+
+    sim = TwoParticleMD(
+        particle1=particle1,
+        particle2=particle2,
+        potential=lj,
+        box_size=(box_w, box_h),
+        dt=dt
+    )
+
+    # Preallocate history arrays (initial state + one row per step)
+    # and fill them by index instead of appending to lists
+    n_rec = n_steps + 1
+    history = {}
+    for key in ('pos1', 'pos2'):
+        history[key] = np.empty((n_rec, 2))
+    for key in ('time', 'kinetic', 'potential', 'total'):
+        history[key] = np.empty(n_rec)
+    for key in ('wall_collisions_1', 'wall_collisions_2'):
+        history[key] = np.empty(n_rec, dtype=np.int64)
+
+    # Initial state
+    history['pos1'][0] = sim.particle1.position
+    history['pos2'][0] = sim.particle2.position
+    history['kinetic'][0], history['potential'][0], _ = sim.get_energies()
+    history['wall_collisions_1'][0] = sim.wall_collision_count_1
+    history['wall_collisions_2'][0] = sim.wall_collision_count_2
+
+    # Run the trajectory in PROGRESS_CHUNKS compiled calls on the
+    # simulation's own state arrays (each call continues where the last
+    # one stopped); the kernel also records the energies
+    pos, vel, force, accel, mass, is_fixed, coll_counts = sim.kernel_state()
+    bounds = np.linspace(0, n_steps, min(PROGRESS_CHUNKS, n_steps) + 1).astype(int)
+    for start, stop in zip(bounds[:-1] + 1, bounds[1:] + 1):
+        run_md(pos, vel, force, accel, mass, is_fixed, epsilon, sigma,
+               box_w, box_h, dt, stop - start, coll_counts,
+               history['pos1'][start:stop], history['pos2'][start:stop],
+               history['wall_collisions_1'][start:stop],
+               history['wall_collisions_2'][start:stop],
+               history['kinetic'][start:stop], history['potential'][start:stop])
+        if progress is not None:
+            progress(stop - 1, n_steps)
+    history['time'][:] = dt * np.arange(n_rec)
+    np.add(history['kinetic'], history['potential'], out=history['total'])
+
+    return history
+
+
+@st.cache_data
+def run_sim(epsilon, sigma, box_w, box_h, dt, n_steps, seed,
+            mass1, v1x, v1y, fixed1, mass2, v2x, v2y, fixed2):
+    """Cached simulate() with a progress bar.
+
+    Results are cached on the parameter values, so rerunning identical
+    parameters returns the stored arrays instead of simulating again.
+    The progress widgets are created here so Streamlit can replay them
+    on a cache hit.
+    """
+    # One element carries both the bar and the status text, so every
+    # update is a single message to the frontend
+    progress_bar = st.progress(0, text="Starting simulation...")
+
+    def show_progress(done, total):
+        progress = done / total
+        progress_bar.progress(progress, text=f"Progress: {progress * 100:.0f}% ({done}/{total} steps)")
+
+    history = simulate(epsilon, sigma, box_w, box_h, dt, n_steps, seed,
+                       mass1, v1x, v1y, fixed1, mass2, v2x, v2y, fixed2,
+                       progress=show_progress)
+    progress_bar.progress(1.0, text="Simulation complete!")
+
+    separation = np.hypot(*(history['pos1'][0] - history['pos2'][0]))
+    if separation < 2.0 * sigma:
+        st.warning(f"⚠️ Could not place the particles at least {2.0 * sigma:.2f} Å apart "
+                   f"in a {box_w} x {box_h} Å box; starting {separation:.2f} Å apart. "
+                   "Use a larger box or a smaller sigma.")
+    return history
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def trajectory_figure(pos1, pos2, box_size, max_points=MAX_PLOT_POINTS):
+    """Create the trajectory plot from (n, 2) position arrays.
+
+    The paths are decimated to at most max_points (+1) points.
+    """
+    fig = Figure(figsize=(8, 8), dpi=100)
+    ax = fig.subplots()
     
     # Draw box boundaries
-    width, height = sim.box_size
+    width, height = box_size
     ax.plot([0, width, width, 0, 0], [0, 0, height, height, 0], 'k-', linewidth=2)
     
-    # Plot trajectories
-    ax.plot(pos1[:, 0], pos1[:, 1], 'b-', alpha=0.6, linewidth=1.5, label='Particle 1 path')
-    ax.plot(pos2[:, 0], pos2[:, 1], 'r-', alpha=0.6, linewidth=1.5, label='Particle 2 path')
+    # Plot trajectories (decimated and rasterized, so long paths render
+    # at a fixed pixel cost instead of one vector segment per step)
+    path1, path2 = _decimate(pos1, max_points), _decimate(pos2, max_points)
+    line1, = ax.plot(path1[:, 0], path1[:, 1], 'b-', alpha=0.6, linewidth=1.5, label='Particle 1 path', rasterized=True)
+    line2, = ax.plot(path2[:, 0], path2[:, 1], 'r-', alpha=0.6, linewidth=1.5, label='Particle 2 path', rasterized=True)
+    line1.set_antialiased(False)
+    line2.set_antialiased(False)
     
     # Mark starting positions
     ax.scatter([pos1[0, 0]], [pos1[0, 1]], c='blue', marker='x', s=200, label='Start 1', linewidths=2, zorder=5)
@@ -59,23 +244,30 @@ def create_trajectory_figure(sim):
     ax.set_xlim(-0.5, width + 0.5)
     ax.set_ylim(-0.5, height + 0.5)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
-def create_energy_figure(sim):
-    """Create energy plot and return the figure."""
-    if len(sim.history['time']) == 0:
-        return None
-    
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8))
-    
-    time = np.array(sim.history['time'])
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def energy_figure(time, kinetic, potential, total, max_points=MAX_PLOT_POINTS):
+    """Create the energy plot from per-record time and energy arrays.
+
+    The curves are decimated to at most max_points (+1) points.
+    """
+    time, kinetic, potential, total = (
+        _decimate(a, max_points) for a in (time, kinetic, potential, total))
+
+    fig = Figure(figsize=(10, 8))
+    ax1, ax2 = fig.subplots(2, 1)
     
     # Top plot: All energy components
-    ax1.plot(time, sim.history['kinetic'], 'b-', label='Kinetic Energy', linewidth=1.5)
-    ax1.plot(time, sim.history['potential'], 'r-', label='Potential Energy', linewidth=1.5)
-    ax1.plot(time, sim.history['total'], 'k-', label='Total Energy', linewidth=2)
+    energy_lines = [
+        ax1.plot(time, kinetic, 'b-', label='Kinetic Energy', linewidth=1.5)[0],
+        ax1.plot(time, potential, 'r-', label='Potential Energy', linewidth=1.5)[0],
+        ax1.plot(time, total, 'k-', label='Total Energy', linewidth=2)[0],
+    ]
+    for line in energy_lines:
+        line.set_antialiased(False)
     ax1.set_xlabel('Time (fs)')
     ax1.set_ylabel('Energy (kcal/mol)')
     ax1.set_title('Energy Components vs Time')
@@ -83,9 +275,8 @@ def create_energy_figure(sim):
     ax1.grid(True, alpha=0.3)
     
     # Bottom plot: Total energy deviation
-    total_energy = np.array(sim.history['total'])
-    initial_energy = total_energy[0]
-    energy_deviation = total_energy - initial_energy
+    initial_energy = total[0]
+    energy_deviation = total - initial_energy
     
     ax2.plot(time, energy_deviation, 'g-', linewidth=1.5)
     ax2.set_xlabel('Time (fs)')
@@ -94,154 +285,170 @@ def create_energy_figure(sim):
     ax2.grid(True, alpha=0.3)
     ax2.axhline(y=0, color='k', linestyle='--', alpha=0.5)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
-def create_distance_figure(sim):
-    """Create distance plot and return the figure."""
-    if len(sim.history['pos1']) == 0:
-        return None
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def distance_figure(time, pos1, pos2, sigma, max_points=MAX_PLOT_POINTS):
+    """Create the distance plot from time and (n, 2) position arrays.
+
+    The curve is decimated to at most max_points (+1) points.
+    """
+    time, pos1, pos2 = (_decimate(a, max_points) for a in (time, pos1, pos2))
 
-    pos1 = np.array(sim.history['pos1'])
-    pos2 = np.array(sim.history['pos2'])
-    distances = np.linalg.norm(pos1 - pos2, axis=1)
+    # Distance between particles (same as TwoParticleMD.plot_distance)
+    distances = np.hypot(pos1[:, 0] - pos2[:, 0], pos1[:, 1] - pos2[:, 1])
 
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.plot(sim.history['time'], distances, 'purple', linewidth=1.5)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.plot(time, distances, 'purple', linewidth=1.5)
     ax.set_xlabel('Time (fs)', fontsize=12)
     ax.set_ylabel('Distance (Angstrom)', fontsize=12)
     ax.set_title('Inter-particle Distance vs Time', fontsize=14)
     ax.grid(True, alpha=0.3)
 
     # Add reference line for equilibrium distance
-    r_eq = 2 ** (1/6) * sim.potential.sigma
+    r_eq = 2 ** (1/6) * sigma
     ax.axhline(y=r_eq, color='red', linestyle='--', label=f'Equilibrium distance = {r_eq:.3f} A')
     ax.legend(fontsize=10)
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
-def create_plotly_animated_trajectory(sim, frame_step=10):
-    """Create Plotly animated trajectory with growing paths, slider and play/pause controls.
-
-    Args:
-        sim: TwoParticleMD simulation object with history
-        frame_step: Step size for animation frames (to reduce total frames)
+def _history_arrays(sim, *keys):
+    """Return sim.history entries as arrays, reading the history dict once.
 
-    Returns:
-        Plotly figure with animation slider and controls
+    Array histories (TwoParticleMD after run(), or the app's preallocated
+    results) pass through np.asarray without a copy.
     """
-    if len(sim.history['pos1']) == 0:
+    history = sim.history
+    return [np.asarray(history[key]) for key in keys]
+
+
+def create_trajectory_figure(sim):
+    """Create trajectory plot and return the figure."""
+    pos1, pos2 = _history_arrays(sim, 'pos1', 'pos2')
+    if len(pos1) == 0:
+        return None
+
+    return trajectory_figure(pos1, pos2, tuple(sim.box_size))
+
+
+def create_energy_figure(sim):
+    """Create energy plot and return the figure."""
+    time, kinetic, potential, total = _history_arrays(
+        sim, 'time', 'kinetic', 'potential', 'total')
+    if len(time) == 0:
+        return None
+
+    return energy_figure(time, kinetic, potential, total)
+
+
+def create_distance_figure(sim):
+    """Create distance plot and return the figure."""
+    time, pos1, pos2 = _history_arrays(sim, 'time', 'pos1', 'pos2')
+    if len(pos1) == 0:
         return None
 
-    pos1 = np.array(sim.history['pos1'])
-    pos2 = np.array(sim.history['pos2'])
-    times = sim.history['time']
-    width, height = sim.box_size
+    return distance_figure(time, pos1, pos2, sim.potential.sigma)
+
+
+def _arc_length_frames(pos1, pos2, n_target):
+    """Pick about n_target record indices at equal steps of travelled distance.
+
+    Frames concentrate where the particles actually move (e.g. around
+    collisions) instead of being spent on quiescent stretches. The first
+    and last records are always included; without any motion the
+    frames are spaced uniformly in time.
+    """
+    n = len(pos1)
+    if n <= n_target:
+        return list(range(n))
+    # Cumulative path length of both particles (a fixed one adds zero)
+    d1, d2 = np.diff(pos1, axis=0), np.diff(pos2, axis=0)
+    seg = np.sqrt(np.einsum('ij,ij->i', d1, d1)) + np.sqrt(np.einsum('ij,ij->i', d2, d2))
+    cum = np.concatenate(([0.0], np.cumsum(seg)))
+    if cum[-1] <= 0.0:
+        indices = np.linspace(0, n - 1, n_target).round().astype(int)
+    else:
+        indices = np.searchsorted(cum, np.linspace(0.0, cum[-1], n_target))
+    return np.unique(np.concatenate(([0], np.minimum(indices, n - 1), [n - 1]))).tolist()
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES, show_spinner=False)
+def plotly_trajectory_figure(pos1, pos2, times, box_size, frame_step=10):
+    """Create the animated Plotly trajectory from (n, 2) position arrays."""
+    width, height = box_size
 
     n_frames = len(pos1)
-    # Sample frames to keep animation smooth
-    frame_indices = list(range(0, n_frames, max(1, frame_step)))
-    if frame_indices[-1] != n_frames - 1:
-        frame_indices.append(n_frames - 1)
-
-    # Build DataFrame for Plotly Express to get working slider infrastructure
-    data_rows = []
-    for idx in frame_indices:
-        time_label = f"{times[idx]:.1f} fs"
-        data_rows.append({
-            'x': pos1[idx, 0], 'y': pos1[idx, 1],
-            'particle': 'Particle 1', 'frame': time_label, 'frame_idx': idx
-        })
-        data_rows.append({
-            'x': pos2[idx, 0], 'y': pos2[idx, 1],
-            'particle': 'Particle 2', 'frame': time_label, 'frame_idx': idx
-        })
-
-    df = pd.DataFrame(data_rows)
-
-    # Create base figure with Plotly Express (this gives us working slider)
-    fig = px.scatter(
-        df, x='x', y='y', color='particle', animation_frame='frame',
-        color_discrete_map={'Particle 1': 'blue', 'Particle 2': 'red'},
-        range_x=[-0.5, width + 0.5], range_y=[-0.5, height + 0.5],
+    # Sample about n_frames / frame_step frames, spaced by path length
+    frame_indices = _arc_length_frames(pos1, pos2, -(-n_frames // max(1, frame_step)) + 1)
+    frame_names = [f"{times[idx]:.1f} fs" for idx in frame_indices]
+
+    # Trace styles as plain dicts (validated once when the figure is built)
+    particle_styles = [
+        dict(type='scattergl', mode='markers', name=f'Particle {k}', legendgroup=f'Particle {k}',
+             marker=dict(color=color, size=18, line=dict(width=2, color='DarkSlateGrey')))
+        for k, color in ((1, 'blue'), (2, 'red'))
+    ]
+    path_styles = [
+        dict(type='scattergl', mode='lines', line=dict(color=color, width=2),
+             opacity=0.6, name=f'Path {k}')
+        for k, color in ((1, 'blue'), (2, 'red'))
+    ]
+
+    # Figure traces: 0-1 particles, 2-3 start markers, 4-5 paths.
+    # Paths start at the first position and grow in the frames
+    data = [
+        dict(particle_styles[0], x=[pos1[0, 0]], y=[pos1[0, 1]]),
+        dict(particle_styles[1], x=[pos2[0, 0]], y=[pos2[0, 1]]),
+        dict(type='scatter', x=[pos1[0, 0]], y=[pos1[0, 1]], mode='markers',
+             marker=dict(symbol='x', size=15, color='blue', line=dict(width=2)),
+             name='Start 1'),
+        dict(type='scatter', x=[pos2[0, 0]], y=[pos2[0, 1]], mode='markers',
+             marker=dict(symbol='x', size=15, color='red', line=dict(width=2)),
+             name='Start 2'),
+        dict(path_styles[0], x=[pos1[0, 0]], y=[pos1[0, 1]]),
+        dict(path_styles[1], x=[pos2[0, 0]], y=[pos2[0, 1]]),
+    ]
+
+    # Path coordinates as column views, sliced per frame without copying;
+    # Plotly takes the array slices directly instead of per-element lists
+    p1x, p1y, p2x, p2y = pos1[:, 0], pos1[:, 1], pos2[:, 0], pos2[:, 1]
+
+    # The start markers never change, so each frame only carries the
+    # particle and path traces and names their targets in frame.traces
+    frame_traces = [0, 1, 4, 5]
+    frames = [
+        dict(name=name, traces=frame_traces, data=[
+            dict(particle_styles[0], x=p1x[idx:idx+1], y=p1y[idx:idx+1]),
+            dict(particle_styles[1], x=p2x[idx:idx+1], y=p2y[idx:idx+1]),
+            dict(path_styles[0], x=p1x[:idx+1], y=p1y[:idx+1]),
+            dict(path_styles[1], x=p2x[:idx+1], y=p2y[:idx+1]),
+        ])
+        for idx, name in zip(frame_indices, frame_names)
+    ]
+
+    # One slider step per frame (WebGL traces need redraw to update)
+    slider_steps = [
+        {'args': [[name], {'frame': {'duration': 0, 'redraw': True},
+                           'mode': 'immediate', 'transition': {'duration': 0}}],
+         'label': name, 'method': 'animate'}
+        for name in frame_names
+    ]
+
+    layout = dict(
         title='Particle Trajectory Animation',
-        labels={'x': 'X (Angstrom)', 'y': 'Y (Angstrom)'},
-    )
-
-    # Make current position markers larger
-    fig.update_traces(marker=dict(size=18, line=dict(width=2, color='DarkSlateGrey')))
-
-    # Add box boundary as static shape
-    fig.add_shape(type="rect", x0=0, y0=0, x1=width, y1=height,
-                  line=dict(color="black", width=2))
-
-    # Add start position markers (static, will appear in all frames)
-    fig.add_trace(go.Scatter(
-        x=[pos1[0, 0]], y=[pos1[0, 1]], mode='markers',
-        marker=dict(symbol='x', size=15, color='blue', line=dict(width=2)),
-        name='Start 1', showlegend=True
-    ))
-    fig.add_trace(go.Scatter(
-        x=[pos2[0, 0]], y=[pos2[0, 1]], mode='markers',
-        marker=dict(symbol='x', size=15, color='red', line=dict(width=2)),
-        name='Start 2', showlegend=True
-    ))
-
-    # Add initial trajectory traces (empty, will be populated in frames)
-    fig.add_trace(go.Scatter(
-        x=[pos1[0, 0]], y=[pos1[0, 1]], mode='lines',
-        line=dict(color='blue', width=2), opacity=0.6,
-        name='Path 1', showlegend=True
-    ))
-    fig.add_trace(go.Scatter(
-        x=[pos2[0, 0]], y=[pos2[0, 1]], mode='lines',
-        line=dict(color='red', width=2), opacity=0.6,
-        name='Path 2', showlegend=True
-    ))
-
-    # Now modify each frame to include growing trajectory paths
-    # The px.scatter creates frames with 2 traces (Particle 1, Particle 2)
-    # We need to add: Start1, Start2, Path1, Path2 to each frame
-    for i, frame in enumerate(fig.frames):
-        idx = frame_indices[i]
-        # Get existing particle position traces from the frame
-        existing_data = list(frame.data)
-
-        # Add static start markers
-        existing_data.append(go.Scatter(
-            x=[pos1[0, 0]], y=[pos1[0, 1]], mode='markers',
-            marker=dict(symbol='x', size=15, color='blue', line=dict(width=2)),
-            name='Start 1'
-        ))
-        existing_data.append(go.Scatter(
-            x=[pos2[0, 0]], y=[pos2[0, 1]], mode='markers',
-            marker=dict(symbol='x', size=15, color='red', line=dict(width=2)),
-            name='Start 2'
-        ))
-
-        # Add growing trajectory paths (up to current frame)
-        existing_data.append(go.Scatter(
-            x=pos1[:idx+1, 0].tolist(), y=pos1[:idx+1, 1].tolist(),
-            mode='lines', line=dict(color='blue', width=2), opacity=0.6,
-            name='Path 1'
-        ))
-        existing_data.append(go.Scatter(
-            x=pos2[:idx+1, 0].tolist(), y=pos2[:idx+1, 1].tolist(),
-            mode='lines', line=dict(color='red', width=2), opacity=0.6,
-            name='Path 2'
-        ))
-
-        # Update the frame with new data
-        frame.data = tuple(existing_data)
-
-    # Update layout
-    fig.update_layout(
         height=650,
-        xaxis=dict(scaleanchor='y', scaleratio=1),
+        xaxis=dict(title='X (Angstrom)', range=[-0.5, width + 0.5],
+                   scaleanchor='y', scaleratio=1),
+        yaxis=dict(title='Y (Angstrom)', range=[-0.5, height + 0.5]),
         legend=dict(x=1.02, y=0.5, xanchor='left'),
+        # Box boundary as static shape
+        shapes=[dict(type='rect', x0=0, y0=0, x1=width, y1=height,
+                     line=dict(color='black', width=2))],
         updatemenus=[{
             'buttons': [
                 {'args': [None, {'frame': {'duration': 100, 'redraw': True},
@@ -261,11 +468,28 @@ def create_plotly_animated_trajectory(sim, frame_step=10):
                            'visible': True, 'xanchor': 'center'},
             'transition': {'duration': 0}, 'pad': {'b': 10, 't': 50},
             'len': 0.9, 'x': 0.1, 'y': 0,
-            'steps': fig.layout.sliders[0].steps if fig.layout.sliders else []
+            'steps': slider_steps
         }]
     )
 
-    return fig
+    return go.Figure(data=data, layout=layout, frames=frames)
+
+
+def create_plotly_animated_trajectory(sim, frame_step=10):
+    """Create Plotly animated trajectory with growing paths, slider and play/pause controls.
+
+    Args:
+        sim: TwoParticleMD simulation object with history
+        frame_step: Step size for animation frames (to reduce total frames)
+
+    Returns:
+        Plotly figure with animation slider and controls
+    """
+    pos1, pos2, times = _history_arrays(sim, 'pos1', 'pos2', 'time')
+    if len(pos1) == 0:
+        return None
+
+    return plotly_trajectory_figure(pos1, pos2, times, tuple(sim.box_size), frame_step)
 
 
 def main():
@@ -332,107 +556,29 @@ def main():
 
     # Run simulation when button is clicked
     if run_button:
-        # Set random seed
-        np.random.seed(random_seed)
-
-        # Create potential
-        lj = LennardJonesPotential(epsilon=epsilon, sigma=sigma)
-
-        # Generate random positions with minimum separation
-        min_separation = 2.0 * sigma
-        max_attempts = 100
-
-        for attempt in range(max_attempts):
-            pos1 = np.array([
-                np.random.uniform(sigma, box_width - sigma),
-                np.random.uniform(sigma, box_height - sigma)
-            ])
-            pos2 = np.array([
-                np.random.uniform(sigma, box_width - sigma),
-                np.random.uniform(sigma, box_height - sigma)
-            ])
-
-            if np.linalg.norm(pos1 - pos2) >= min_separation:
-                break
-
-        # Create particles
-        particle1 = Particle(
-            position=pos1,
-            velocity=np.array([vel1_x, vel1_y]),
-            mass=mass1,
-            is_fixed=fixed1
-        )
-
-        particle2 = Particle(
-            position=pos2,
-            velocity=np.array([vel2_x, vel2_y]),
-            mass=mass2,
-            is_fixed=fixed2
-        )
+        # Create and run simulation (cached on the parameter values)
+        with st.spinner("Running simulation..."):
+            history = run_sim(epsilon, sigma, box_width, box_height, dt,
+                              int(n_steps), int(random_seed),
+                              mass1, vel1_x, vel1_y, fixed1,
+                              mass2, vel2_x, vel2_y, fixed2)
 
         # Show initial positions
+        pos1, pos2 = history['pos1'][0], history['pos2'][0]
         st.info(f"**Initial Positions:** Particle 1 at ({pos1[0]:.2f}, {pos1[1]:.2f}), Particle 2 at ({pos2[0]:.2f}, {pos2[1]:.2f})")
 
-        # Create and run simulation
-        with st.spinner("Running simulation..."):
-            sim = TwoParticleMD(
-                particle1=particle1,
-                particle2=particle2,
-                potential=lj,
-                box_size=(box_width, box_height),
-                dt=dt
-            )
-
-            # Progress bar
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-
-            # Run simulation with progress updates
-            sim.history['time'].append(sim.time)
-            sim.history['pos1'].append(sim.particle1.position.copy())
-            sim.history['pos2'].append(sim.particle2.position.copy())
-            sim.history['vel1'].append(sim.particle1.velocity.copy())
-            sim.history['vel2'].append(sim.particle2.velocity.copy())
-            ke, pe, total = sim.get_energies()
-            sim.history['kinetic'].append(ke)
-            sim.history['potential'].append(pe)
-            sim.history['total'].append(total)
-            sim.history['wall_collisions_1'].append(sim.wall_collision_count_1)
-            sim.history['wall_collisions_2'].append(sim.wall_collision_count_2)
-
-            for step in range(n_steps):
-                sim.step()
-
-                # Record state
-                sim.history['time'].append(sim.time)
-                sim.history['pos1'].append(sim.particle1.position.copy())
-                sim.history['pos2'].append(sim.particle2.position.copy())
-                sim.history['vel1'].append(sim.particle1.velocity.copy())
-                sim.history['vel2'].append(sim.particle2.velocity.copy())
-                ke, pe, total = sim.get_energies()
-                sim.history['kinetic'].append(ke)
-                sim.history['potential'].append(pe)
-                sim.history['total'].append(total)
-                sim.history['wall_collisions_1'].append(sim.wall_collision_count_1)
-                sim.history['wall_collisions_2'].append(sim.wall_collision_count_2)
-
-                # Update progress every 1%
-                if (step + 1) % max(1, n_steps // 100) == 0:
-                    progress = (step + 1) / n_steps
-                    progress_bar.progress(progress)
-                    status_text.text(f"Progress: {progress * 100:.0f}% ({step + 1}/{n_steps} steps)")
-
-            progress_bar.progress(1.0)
-            status_text.text("Simulation complete!")
-
-        # Store simulation in session state
-        st.session_state['simulation'] = sim
+        # Store simulation results in session state
+        st.session_state['simulation'] = {
+            'history': history,
+            'box_size': (box_width, box_height),
+            'sigma': sigma,
+        }
 
         # Display results
-        st.success(f"✅ Simulation completed! Wall collisions: Particle 1 = {sim.wall_collision_count_1}, Particle 2 = {sim.wall_collision_count_2}")
+        st.success(f"✅ Simulation completed! Wall collisions: Particle 1 = {history['wall_collisions_1'][-1]}, Particle 2 = {history['wall_collisions_2'][-1]}")
 
         # Energy statistics
-        total_energies = np.array(sim.history['total'])
+        total_energies = history['total']
         initial_energy = total_energies[0]
         final_energy = total_energies[-1]
         energy_drift = final_energy - initial_energy
@@ -447,11 +593,18 @@ def main():
     # ==================== BOTTOM SECTION: Visualization ====================
     # Display plots if simulation exists
     if 'simulation' in st.session_state:
-        sim = st.session_state['simulation']
+        result = st.session_state['simulation']
+        history = result['history']
 
         st.markdown("---")
         st.header("📊 Visualization")
 
+        # Static plots draw at most this many points per curve
+        max_plot_points = st.sidebar.slider(
+            "Max points per static plot", min_value=500, max_value=50000,
+            value=MAX_PLOT_POINTS, step=500,
+            help="Longer trajectories are decimated before plotting")
+
         # Two main tabs: Static Outputs and Interactive
         tab_static, tab_interactive = st.tabs(["📈 Static Outputs", "🎬 Interactive Trajectory"])
 
@@ -461,30 +614,30 @@ def main():
 
             # Trajectory plot
             st.markdown("### 🗺️ Particle Trajectories")
-            fig_traj = create_trajectory_figure(sim)
+            fig_traj = trajectory_figure(history['pos1'], history['pos2'], result['box_size'],
+                                         max_plot_points)
             if fig_traj:
-                st.pyplot(fig_traj)
-                plt.close(fig_traj)
+                st.pyplot(fig_traj, clear_figure=False)  # Cached, must stay drawn
 
             st.markdown("---")
 
             # Energy plot
             st.markdown("### ⚡ Energy Analysis")
-            fig_energy = create_energy_figure(sim)
+            fig_energy = energy_figure(history['time'], history['kinetic'],
+                                       history['potential'], history['total'], max_plot_points)
             if fig_energy:
-                st.pyplot(fig_energy)
-                plt.close(fig_energy)
+                st.pyplot(fig_energy, clear_figure=False)  # Cached, must stay drawn
 
             st.markdown("---")
 
             # Distance plot
             st.markdown("### 📏 Inter-particle Distance")
-            fig_dist = create_distance_figure(sim)
+            fig_dist = distance_figure(history['time'], history['pos1'], history['pos2'],
+                                       result['sigma'], max_plot_points)
             if fig_dist:
-                st.pyplot(fig_dist)
-                plt.close(fig_dist)
+                st.pyplot(fig_dist, clear_figure=False)  # Cached, must stay drawn
 
-        # Tab 2: Interactive trajectory viewer with Plotly Express animation
+        # Tab 2: Interactive trajectory viewer with Plotly animation
         with tab_interactive:
             st.subheader("🎬 Interactive Trajectory Viewer")
             st.markdown("""
@@ -492,13 +645,14 @@ def main():
             The full trajectory paths are shown in light colors, with current positions as large markers.
             """)
 
-            n_frames = len(sim.history['pos1'])
+            n_frames = len(history['pos1'])
             if n_frames > 1:
                 # Calculate default frame step based on number of frames (aim for ~100 frames max)
                 default_step = max(1, n_frames // 100)
 
-                # Create and display Plotly Express animated figure
-                fig_plotly = create_plotly_animated_trajectory(sim, frame_step=default_step)
+                # Create and display Plotly animated figure
+                fig_plotly = plotly_trajectory_figure(history['pos1'], history['pos2'], history['time'],
+                                                      result['box_size'], frame_step=default_step)
                 if fig_plotly:
                     st.plotly_chart(fig_plotly, use_container_width=True)
 
@@ -506,8 +660,8 @@ def main():
                 st.markdown("**Simulation Summary:**")
                 info_col1, info_col2, info_col3 = st.columns(3)
                 info_col1.metric("Total Frames", n_frames)
-                info_col2.metric("Total Time", f"{sim.history['time'][-1]:.1f} fs")
-                info_col3.metric("Animation Frames", len(range(0, n_frames, max(1, default_step))) + 1)
+                info_col2.metric("Total Time", f"{history['time'][-1]:.1f} fs")
+                info_col3.metric("Animation Frames", len(fig_plotly.frames))
             else:
                 st.warning("Not enough frames to display interactive trajectory.")
 
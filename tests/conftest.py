@@ -0,0 +1,42 @@
+"""
+Shared pytest configuration and fixtures for the test suite.
+
+Puts the project root (for ``src.*`` imports) and src/ (for the modules'
+own top-level imports, e.g. ``md_simulation`` in the Streamlit app) on
+sys.path once per session instead of in every test module.
+"""
+import os
+import sys
+
+import pytest
+
+_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for _path in (_root, os.path.join(_root, 'src')):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from src.md_simulation import LennardJonesPotential, Particle, TwoParticleMD  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def lj_potential():
+    """Lennard-Jones potential with Argon parameters, shared by all tests.
+
+    A test that needs other parameters should build its own instance
+    rather than reassign epsilon/sigma on the shared one.
+    """
+    return LennardJonesPotential(epsilon=0.238, sigma=3.4)
+
+
+@pytest.fixture(scope="module")
+def _template_sim(lj_potential):
+    """Canonical simulation (mobile particle 1, fixed particle 2) built once per module.
+
+    Tests deep-copy it (or build a new simulation from its parameters)
+    rather than run it in place.
+    """
+    particle1 = Particle(position=[5.0, 10.0], velocity=[0.01, 0.0], mass=39.948)
+    particle2 = Particle(position=[15.0, 10.0], velocity=[0.0, 0.0], mass=39.948,
+                         is_fixed=True)
+    return TwoParticleMD(particle1, particle2, lj_potential,
+                         box_size=(20.0, 20.0), dt=1.0)
@@ -0,0 +1,76 @@
+"""
+Unit tests for the compiled trajectory kernel used by the Streamlit app.
+"""
+import pytest
+import numpy as np
+
+from src.md_simulation import Particle, TwoParticleMD
+from src.md_kernel import run_md, lj_energy
+
+
+def make_sim(lj_potential, fixed2=False):
+    """Create a simulation whose particle 1 hits the left wall."""
+    particle1 = Particle(position=[1.0, 10.0], velocity=[-0.2, 0.03], mass=39.948)
+    particle2 = Particle(position=[6.0, 10.0], velocity=[0.02, 0.0], mass=39.948,
+                         is_fixed=fixed2)
+    return TwoParticleMD(particle1, particle2, lj_potential,
+                         box_size=(20.0, 20.0), dt=1.0)
+
+
+def run_kernel(sim, n_steps, kernel=run_md):
+    """Run the trajectory kernel on the simulation state and return the outputs."""
+    out = {
+        'pos1': np.empty((n_steps, 2)), 'pos2': np.empty((n_steps, 2)),
+        'coll1': np.empty(n_steps, dtype=np.int64), 'coll2': np.empty(n_steps, dtype=np.int64),
+        'ke': np.empty(n_steps), 'pe': np.empty(n_steps),
+    }
+    pos, vel, force, accel, mass, is_fixed, coll_counts = sim.kernel_state()
+    kernel(pos, vel, force, accel, mass, is_fixed,
+           sim.potential.epsilon, sim.potential.sigma,
+           sim.box_size[0], sim.box_size[1], sim.dt, n_steps, coll_counts,
+           out['pos1'], out['pos2'], out['coll1'], out['coll2'],
+           out['ke'], out['pe'])
+    return out
+
+
+@pytest.mark.parametrize("fixed2", [False, True])
+def test_run_md_matches_step(lj_potential, fixed2):
+    """Test that the recorded trajectory matches step() one step at a time."""
+    n_steps = 300
+    sim_kernel = make_sim(lj_potential, fixed2)
+    out = run_kernel(sim_kernel, n_steps)
+
+    sim_step = make_sim(lj_potential, fixed2)
+    for i in range(n_steps):
+        sim_step.step()
+        np.testing.assert_allclose(out['pos1'][i], sim_step.particle1.position, rtol=1e-9)
+        np.testing.assert_allclose(out['pos2'][i], sim_step.particle2.position, rtol=1e-9)
+        assert out['coll1'][i] == sim_step.wall_collision_count_1
+        ke, pe, _ = sim_step.get_energies()
+        assert out['ke'][i] == pytest.approx(ke, rel=1e-9)
+        assert out['pe'][i] == pytest.approx(pe, rel=1e-9)
+
+    assert out['coll1'][-1] > 0
+    np.testing.assert_allclose(sim_kernel.particle1.force, sim_step.particle1.force, rtol=1e-9)
+    np.testing.assert_allclose(sim_kernel.particle1.velocity, sim_step.particle1.velocity, rtol=1e-9)
+    np.testing.assert_allclose(sim_kernel.particle2.velocity, sim_step.particle2.velocity,
+                               rtol=1e-9, atol=1e-15)
+
+
+def test_lj_energy_overlap_is_inf():
+    """Test that the compiled pair energy returns inf for overlapping particles."""
+    assert lj_energy(0.0, 0.0, 0.238, 3.4) == np.inf
+    assert lj_energy(3.4, 0.0, 0.238, 3.4) == pytest.approx(0.0, abs=1e-15)
+
+
+def test_aot_kernel_matches_jit(lj_potential):
+    """Test that the md_aot build (if present) matches md_kernel.run_md."""
+    md_aot = pytest.importorskip("src.md_aot")
+    n_steps = 200
+    sim_jit = make_sim(lj_potential)
+    out_jit = run_kernel(sim_jit, n_steps)
+
+    sim_aot = make_sim(lj_potential)
+    out_aot = run_kernel(sim_aot, n_steps, kernel=md_aot.run_md)
+    for key in out_jit:
+        np.testing.assert_allclose(out_aot[key], out_jit[key], rtol=1e-9)
@@ -3,11 +3,6 @@ Unit tests for the Particle class.
 """
 import pytest
 import numpy as np
-import sys
-import os
-
-# Add parent directory to path to import from src
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.md_simulation import Particle
 
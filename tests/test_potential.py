@@ -3,168 +3,130 @@ Unit tests for the LennardJonesPotential class.
 """
 import pytest
 import numpy as np
-import sys
-import os
-
-# Add parent directory to path to import from src
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.md_simulation import LennardJonesPotential
 
+# Lennard-Jones parameters (Argon)
+EPSILON = 0.238  # kcal/mol
+SIGMA = 3.4      # Angstrom
 
-@pytest.fixture
-def lj_potential():
-    """Fixture providing a LennardJonesPotential instance with Argon parameters."""
-    epsilon = 0.238  # kcal/mol (Argon)
-    sigma = 3.4      # Angstrom (Argon)
-    return LennardJonesPotential(epsilon=epsilon, sigma=sigma)
-
-
-@pytest.fixture
-def lj_params():
-    """Fixture providing Lennard-Jones parameters."""
-    return {
-        'epsilon': 0.238,  # kcal/mol (Argon)
-        'sigma': 3.4       # Angstrom (Argon)
-    }
+# Characteristic distances, evaluated once
+R_EQ = 2 ** (1/6) * SIGMA    # potential minimum, zero force
+R_SHORT = 0.9 * SIGMA        # repulsive
+R_MED = 1.2 * SIGMA          # attractive
+R_ATTR = 1.5 * SIGMA         # attractive force
+R_FAR1 = 10.0 * SIGMA
+R_FAR2 = 20.0 * SIGMA
+R_INF = 100.0 * SIGMA        # effectively infinite separation
 
 
-def test_initialization(lj_potential, lj_params):
+def test_initialization(lj_potential):
     """Test that potential is initialized correctly."""
-    assert lj_potential.epsilon == lj_params['epsilon']
-    assert lj_potential.sigma == lj_params['sigma']
-    
-def test_potential_at_equilibrium(lj_potential, lj_params):
-    """Test potential energy at equilibrium distance."""
-    # Equilibrium distance: r_eq = 2^(1/6) * sigma
-    r_eq = 2 ** (1/6) * lj_params['sigma']
-
-    # At equilibrium, U(r_eq) = -epsilon
-    potential = lj_potential.potential(r_eq)
-
-    assert potential == pytest.approx(-lj_params['epsilon'], rel=1e-5)
-
-
-def test_potential_at_sigma(lj_potential, lj_params):
-    """Test potential energy at r = sigma (zero crossing)."""
-    # At r = sigma, U(sigma) = 0
-    potential = lj_potential.potential(lj_params['sigma'])
-
-    assert potential == pytest.approx(0.0, abs=1e-10)
-
-
-def test_potential_at_infinity(lj_potential, lj_params):
-    """Test potential energy at large distance."""
-    # At large r, U(r) -> 0
-    potential = lj_potential.potential(100.0 * lj_params['sigma'])
-
-    assert potential == pytest.approx(0.0, rel=1e-5)
-
-
-def test_potential_is_repulsive_at_short_range(lj_potential, lj_params):
-    """Test that potential is positive (repulsive) at short distances."""
-    r_short = 0.9 * lj_params['sigma']
-    potential = lj_potential.potential(r_short)
-
-    assert potential > 0.0
-
-
-def test_potential_is_attractive_at_medium_range(lj_potential, lj_params):
-    """Test that potential is negative (attractive) at medium distances."""
-    r_medium = 1.2 * lj_params['sigma']
-    potential = lj_potential.potential(r_medium)
-
-    assert potential < 0.0
-    
-def test_force_magnitude_at_equilibrium(lj_potential, lj_params):
-    """Test that force is zero at equilibrium distance."""
-    r_eq = 2 ** (1/6) * lj_params['sigma']
-    force = lj_potential.force_magnitude(r_eq)
-
-    assert force == pytest.approx(0.0, abs=1e-5)
-
-
-def test_force_is_repulsive_at_short_range(lj_potential, lj_params):
-    """Test that force is positive (repulsive) at short distances."""
-    r_short = 0.9 * lj_params['sigma']
-    force = lj_potential.force_magnitude(r_short)
-
-    assert force > 0.0
-
-
-def test_force_is_attractive_at_medium_range(lj_potential, lj_params):
-    """Test that force is negative (attractive) at medium distances."""
-    r_medium = 1.5 * lj_params['sigma']
-    force = lj_potential.force_magnitude(r_medium)
-
-    assert force < 0.0
-
-
-def test_force_vector_direction(lj_potential, lj_params):
-    """Test that force vector points in correct direction."""
-    # At equilibrium distance, force should be zero
-    r_eq = 2 ** (1/6) * lj_params['sigma']
-    r_vector = np.array([r_eq, 0.0])
-    force_vector = lj_potential.force_vector(r_vector)
-
-    # At equilibrium, force should be zero
-    np.testing.assert_array_almost_equal(force_vector, np.array([0.0, 0.0]), decimal=5)
-    
-def test_force_vector_repulsive(lj_potential, lj_params):
-    """Test force vector in repulsive regime."""
-    # Short distance: particles should repel
-    r_vector = np.array([0.9 * lj_params['sigma'], 0.0])
-    force_vector = lj_potential.force_vector(r_vector)
-
-    # Force should point in same direction as r_vector (repulsive)
-    assert force_vector[0] > 0.0
-    assert force_vector[1] == pytest.approx(0.0, abs=1e-10)
-
-
-def test_force_vector_attractive(lj_potential, lj_params):
-    """Test force vector in attractive regime."""
-    # Medium distance: particles should attract
-    r_vector = np.array([1.5 * lj_params['sigma'], 0.0])
-    force_vector = lj_potential.force_vector(r_vector)
-
-    # Force should point opposite to r_vector (attractive)
-    assert force_vector[0] < 0.0
-    assert force_vector[1] == pytest.approx(0.0, abs=1e-10)
-
-
-def test_force_vector_2d(lj_potential):
-    """Test force vector in 2D."""
-    r_vector = np.array([3.0, 4.0])  # Distance = 5.0
-    force_vector = lj_potential.force_vector(r_vector)
-
-    # Force should be parallel to r_vector
-    # Check that force_vector = k * r_vector for some scalar k
-    ratio = force_vector[0] / r_vector[0]
-    assert force_vector[1] / r_vector[1] == pytest.approx(ratio, rel=1e-10)
-
-
-def test_potential_decreases_with_distance(lj_potential, lj_params):
-    """Test that potential magnitude decreases at large distances."""
-    # At large distances, potential should approach zero
-    r1 = 10.0 * lj_params['sigma']
-    r2 = 20.0 * lj_params['sigma']
-
-    potential1 = abs(lj_potential.potential(r1))
-    potential2 = abs(lj_potential.potential(r2))
-
-    # Potential should be smaller at larger distance
-    assert potential2 < potential1
-
-
-def test_force_decreases_with_distance(lj_potential, lj_params):
-    """Test that force magnitude decreases at large distances."""
-    # At large distances, force should approach zero
-    r1 = 10.0 * lj_params['sigma']
-    r2 = 20.0 * lj_params['sigma']
-
-    force1 = abs(lj_potential.force_magnitude(r1))
-    force2 = abs(lj_potential.force_magnitude(r2))
-
-    # Force should be smaller at larger distance
-    assert force2 < force1
-
+    assert lj_potential.epsilon == EPSILON
+    assert lj_potential.sigma == SIGMA
+
+
+def test_potential_values(lj_potential):
+    """Test the potential at characteristic distances in one vectorized call."""
+    # r_eq, zero crossing, far field, repulsive, attractive
+    r = np.array([R_EQ, SIGMA, R_INF, R_SHORT, R_MED, R_FAR1, R_FAR2])
+    expected = 4.0 * EPSILON * ((SIGMA / r) ** 12 - (SIGMA / r) ** 6)
+
+    potential = lj_potential.potential(r)
+
+    np.testing.assert_allclose(potential, expected, rtol=1e-5, atol=1e-12)
+    # U(r_eq) = -epsilon, U(sigma) = 0 and U -> 0 at large r
+    np.testing.assert_allclose(potential[:3], [-EPSILON, 0.0, 0.0], rtol=1e-5, atol=1e-10)
+    # Repulsive at short range, attractive at medium range
+    assert potential[3] > 0.0
+    assert potential[4] < 0.0
+    # Magnitude decays with distance
+    assert abs(potential[6]) < abs(potential[5])
+    # The array path agrees with scalar calls
+    np.testing.assert_allclose(potential, [lj_potential.potential(x) for x in r], rtol=1e-12)
+
+
+def test_force_magnitude_values(lj_potential):
+    """Test the force magnitude at characteristic distances in one vectorized call."""
+    # r_eq, repulsive, attractive, far field
+    r = np.array([R_EQ, R_SHORT, R_ATTR, R_FAR1, R_FAR2])
+    expected = 24.0 * EPSILON / r * (2.0 * (SIGMA / r) ** 12 - (SIGMA / r) ** 6)
+
+    force = lj_potential.force_magnitude(r)
+
+    np.testing.assert_allclose(force, expected, rtol=1e-5, atol=1e-12)
+    # Zero at equilibrium, repulsive at short range, attractive at medium range
+    assert force[0] == pytest.approx(0.0, abs=1e-5)
+    assert force[1] > 0.0
+    assert force[2] < 0.0
+    # Magnitude decays with distance
+    assert abs(force[4]) < abs(force[3])
+    np.testing.assert_allclose(force, [lj_potential.force_magnitude(x) for x in r], rtol=1e-12)
+
+
+def test_force_vector_batch(lj_potential):
+    """Test force vector directions for several displacements in one batched call."""
+    # Equilibrium, repulsive, attractive, and a 2D displacement (|r| = 5)
+    r_vectors = np.array([[R_EQ, 0.0],
+                          [R_SHORT, 0.0],
+                          [R_ATTR, 0.0],
+                          [3.0, 4.0]])
+    forces = lj_potential.force_vector(r_vectors)
+
+    assert forces.shape == (4, 2)
+    # Zero at equilibrium; along +x when repulsive, -x when attractive
+    assert np.allclose(forces[0], 0.0, atol=1e-5)
+    assert np.allclose(np.sign(forces[1:3, 0]), [1.0, -1.0])
+    assert np.allclose(forces[1:3, 1], 0.0, atol=1e-10)
+    # Force is parallel to the displacement: F = (F/r) r_vector
+    assert np.allclose(forces[3] * r_vectors[3, ::-1], forces[3, ::-1] * r_vectors[3], rtol=1e-10)
+    # Each row matches the single-displacement call
+    assert np.allclose(forces, np.vstack([lj_potential.force_vector(r) for r in r_vectors]),
+                       rtol=1e-12, atol=0.0)
+
+
+def test_force_over_r_from_r2_matches_force_magnitude(lj_potential):
+    """Test that the r^2 form agrees with the analytic force divided by r."""
+    for r in [R_SHORT, R_MED, 2.5 * SIGMA]:
+        expected = 24.0 * EPSILON / r * (2.0 * (SIGMA / r) ** 12 - (SIGMA / r) ** 6)
+        assert lj_potential.force_over_r_from_r2(r * r) == pytest.approx(expected / r, rel=1e-12)
+        assert lj_potential.force_magnitude(r) == pytest.approx(expected, rel=1e-12)
+
+
+def test_potential_from_r2_matches_potential(lj_potential):
+    """Test that the vectorized r^2 potential agrees with the scalar one."""
+    r = np.array([R_SHORT, SIGMA, R_EQ, 2.5 * SIGMA, R_FAR1])
+    pe = lj_potential.potential_from_r2(r * r)
+    np.testing.assert_allclose(pe, [lj_potential.potential(x) for x in r], rtol=1e-12)
+    assert lj_potential.potential_from_r2(np.array([0.0]))[0] == np.inf
+
+
+def test_force_array_matches_force_vector(lj_potential):
+    """Test that the batch force API agrees with the pairwise force vector."""
+    positions = np.array([[0.0, 0.0], [1.1 * SIGMA, 0.5]])
+    forces = lj_potential.force_array(positions)
+
+    expected = lj_potential.force_vector(positions[0] - positions[1])
+    np.testing.assert_allclose(forces[0], expected, rtol=1e-12)
+    np.testing.assert_allclose(forces[1], -expected, rtol=1e-12)
+
+
+def test_force_array_conserves_momentum(lj_potential):
+    """Test that pair forces for several particles sum to zero."""
+    positions = np.array([[0.0, 0.0], [R_MED, 0.0], [0.4 * SIGMA, 1.1 * SIGMA]])
+    forces = lj_potential.force_array(positions)
+
+    assert forces.shape == (3, 2)
+    np.testing.assert_allclose(forces.sum(axis=0), 0.0, atol=1e-12)
+
+
+def test_parameter_update_refreshes_derived_constants():
+    """Test that changing epsilon or sigma updates potential and force."""
+    lj = LennardJonesPotential(epsilon=EPSILON, sigma=SIGMA)
+    lj.epsilon = 1.0
+    lj.sigma = 2.0
+    r_eq = 2 ** (1/6) * 2.0
+
+    assert lj.potential(r_eq) == pytest.approx(-1.0, rel=1e-12)
+    assert lj.force_magnitude(r_eq) == pytest.approx(0.0, abs=1e-12)
+    assert lj.force_magnitude(2.0) == pytest.approx(24.0 / 2.0, rel=1e-12)
@@ -1,23 +1,11 @@
 """
 Unit tests for the TwoParticleMD simulation class.
 """
+import copy
 import pytest
 import numpy as np
-import sys
-import os
 
-# Add parent directory to path to import from src
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-from src.md_simulation import Particle, LennardJonesPotential, TwoParticleMD
-
-
-@pytest.fixture
-def lj_potential():
-    """Fixture providing a Lennard-Jones potential."""
-    epsilon = 0.238
-    sigma = 3.4
-    return LennardJonesPotential(epsilon=epsilon, sigma=sigma)
+from src.md_simulation import Particle, TwoParticleMD
 
 
 @pytest.fixture
@@ -53,7 +41,18 @@ def simulation(particles, lj_potential):
         box_size=box_size,
         dt=dt
     )
-    
+
+
+def clone_sim(template, pos1, vel1, pos2, dt):
+    """Build a simulation with the template's particles, potential and box at a new initial state."""
+    particle1 = Particle(position=pos1, velocity=vel1, mass=template.particle1.mass,
+                         is_fixed=template.particle1.is_fixed)
+    particle2 = Particle(position=pos2, velocity=template.particle2.velocity.copy(),
+                         mass=template.particle2.mass, is_fixed=template.particle2.is_fixed)
+    return TwoParticleMD(particle1, particle2, template.potential,
+                         box_size=template.box_size, dt=dt)
+
+
 def test_simulation_initialization(simulation):
     """Test that simulation is initialized correctly."""
     assert simulation.dt == 1.0
@@ -94,69 +93,34 @@ def test_run_simulation(simulation):
     expected_time = n_steps * simulation.dt
     assert simulation.time == pytest.approx(expected_time, rel=1e-5)
 
-    # Check that history was recorded
-    assert len(simulation.history['time']) > 0
-    assert len(simulation.history['pos1']) > 0
-    assert len(simulation.history['pos2']) > 0
+    # Check that history was recorded into (n_records, ...) arrays
+    n_records = n_steps // 10 + 1  # +1 for initial state
+    assert simulation.history['time'].shape == (n_records,)
+    assert simulation.history['pos1'].shape == (n_records, 2)
+    assert simulation.history['pos2'].shape == (n_records, 2)
     
-def test_wall_collision_left(lj_potential):
+def test_wall_collision_left(_template_sim):
     """Test that particle bounces off left wall."""
-    particle = Particle(
-        position=np.array([0.5, 10.0]),
-        velocity=np.array([-0.1, 0.0]),  # Moving left
-        mass=39.948
-    )
-
-    fixed_particle = Particle(
-        position=np.array([15.0, 10.0]),
-        velocity=np.array([0.0, 0.0]),
-        mass=39.948,
-        is_fixed=True
-    )
-
-    sim = TwoParticleMD(
-        particle1=particle,
-        particle2=fixed_particle,
-        potential=lj_potential,
-        box_size=(20.0, 20.0),
-        dt=10.0  # Large dt to ensure collision
-    )
+    # Moving left; large dt to ensure collision
+    sim = clone_sim(_template_sim, [0.5, 10.0], [-0.1, 0.0], [15.0, 10.0], dt=10.0)
 
     initial_collisions = sim.wall_collision_count_1
     sim.step()
 
     # Particle should have bounced
-    assert particle.velocity[0] > 0.0  # Velocity reversed
+    assert sim.particle1.velocity[0] > 0.0  # Velocity reversed
     assert sim.wall_collision_count_1 >= initial_collisions
 
 
-def test_wall_collision_right(lj_potential):
+def test_wall_collision_right(_template_sim):
     """Test that particle bounces off right wall."""
-    particle = Particle(
-        position=np.array([19.5, 10.0]),
-        velocity=np.array([0.1, 0.0]),  # Moving right
-        mass=39.948
-    )
-
-    fixed_particle = Particle(
-        position=np.array([5.0, 10.0]),
-        velocity=np.array([0.0, 0.0]),
-        mass=39.948,
-        is_fixed=True
-    )
-
-    sim = TwoParticleMD(
-        particle1=particle,
-        particle2=fixed_particle,
-        potential=lj_potential,
-        box_size=(20.0, 20.0),
-        dt=10.0
-    )
+    # Moving right
+    sim = clone_sim(_template_sim, [19.5, 10.0], [0.1, 0.0], [5.0, 10.0], dt=10.0)
 
     sim.step()
 
     # Particle should have bounced
-    assert particle.velocity[0] < 0.0  # Velocity reversed
+    assert sim.particle1.velocity[0] < 0.0  # Velocity reversed
 
 
 def test_fixed_particle_does_not_move(simulation, particles):
@@ -170,29 +134,10 @@ def test_fixed_particle_does_not_move(simulation, particles):
     np.testing.assert_array_equal(particle2.position, initial_pos)
 
 
-def test_energy_conservation(lj_potential):
+def test_energy_conservation(_template_sim):
     """Test that energy is approximately conserved."""
     # Use smaller time step for better energy conservation
-    particle1 = Particle(
-        position=np.array([8.0, 10.0]),
-        velocity=np.array([0.01, 0.0]),
-        mass=39.948
-    )
-
-    particle2 = Particle(
-        position=np.array([12.0, 10.0]),
-        velocity=np.array([0.0, 0.0]),
-        mass=39.948,
-        is_fixed=True
-    )
-
-    sim = TwoParticleMD(
-        particle1=particle1,
-        particle2=particle2,
-        potential=lj_potential,
-        box_size=(20.0, 20.0),
-        dt=0.1  # Small time step
-    )
+    sim = clone_sim(_template_sim, [8.0, 10.0], [0.01, 0.0], [12.0, 10.0], dt=0.1)
 
     initial_ke, initial_pe, initial_total = sim.get_energies()
     sim.run(n_steps=100, record_interval=1)
@@ -202,6 +147,11 @@ def test_energy_conservation(lj_potential):
     energy_drift = abs(final_total - initial_total) / abs(initial_total)
     assert energy_drift < 0.05
 
+    # ... and stay small for every recorded step (one vectorized check)
+    total = sim.history['total']
+    assert total.shape[0] == 101
+    assert np.max(np.abs(total - initial_total)) / abs(initial_total) < 0.05
+
 
 def test_history_recording(simulation):
     """Test that simulation history is recorded correctly."""
@@ -211,7 +161,197 @@ def test_history_recording(simulation):
 
     # Check that history has correct length
     expected_records = n_steps // record_interval + 1  # +1 for initial state
-    assert len(simulation.history['time']) == expected_records
-    assert len(simulation.history['pos1']) == expected_records
-    assert len(simulation.history['kinetic']) == expected_records
+    assert simulation.history['time'].shape[0] == expected_records
+    assert simulation.history['pos1'].shape == (expected_records, 2)
+    assert simulation.history['kinetic'].shape[0] == expected_records
+
+
+def test_default_record_interval_caps_history(simulation, monkeypatch):
+    """Test that long runs without record_interval keep a bounded history."""
+    import src.md_simulation as md_simulation
+    monkeypatch.setattr(md_simulation, 'MAX_AUTO_RECORDS', 20)
+
+    simulation.run(n_steps=100)
+
+    # 100 // 20 = every 5th step, plus the initial state
+    assert simulation.history['time'].shape[0] == 21
+
+
+def test_store_dtype_float32(simulation):
+    """Test that store_dtype only changes the trajectory storage."""
+    simulation.run(n_steps=20, store_dtype=np.float32)
+
+    assert simulation.history['pos1'].dtype == np.float32
+    assert simulation.history['vel2'].dtype == np.float32
+    assert simulation.history['total'].dtype == np.float64
+    np.testing.assert_allclose(simulation.history['pos1'][-1],
+                               simulation.particle1.position, rtol=1e-6)
+
+
+def test_recorded_energies_match_get_energies(simulation, lj_potential):
+    """Test that the energies filled after run() match get_energies() per step."""
+    reference = TwoParticleMD(
+        *[Particle(position=p.position, velocity=p.velocity, mass=p.mass, is_fixed=p.is_fixed)
+          for p in (simulation.particle1, simulation.particle2)],
+        lj_potential, box_size=simulation.box_size, dt=simulation.dt)
+
+    simulation.run(n_steps=30, record_interval=3)
+
+    expected = [reference.get_energies()]
+    for step in range(30):
+        reference.step()
+        if (step + 1) % 3 == 0:
+            expected.append(reference.get_energies())
+    np.testing.assert_allclose(
+        np.column_stack([simulation.history[key] for key in ('kinetic', 'potential', 'total')]),
+        expected, rtol=1e-10)
+
+
+def test_run_without_recording(simulation, lj_potential):
+    """Test that record=False advances the state but keeps history empty."""
+    reference = TwoParticleMD(
+        *[Particle(position=p.position, velocity=p.velocity, mass=p.mass, is_fixed=p.is_fixed)
+          for p in (simulation.particle1, simulation.particle2)],
+        lj_potential, box_size=simulation.box_size, dt=simulation.dt)
+
+    simulation.run(n_steps=55, record=False)
+    reference.run(n_steps=55)
+
+    assert len(simulation.history['time']) == 0
+    np.testing.assert_allclose(simulation.particle1.position, reference.particle1.position, rtol=1e-9)
+    assert simulation.time == pytest.approx(reference.time)
+
+
+def test_history_continues_across_runs(simulation):
+    """Test that a second run() appends to the history of the first."""
+    simulation.run(n_steps=10)
+    first_positions = simulation.history['pos1'].copy()
+    simulation.run(n_steps=10)
+
+    assert simulation.history['pos1'].shape == (22, 2)
+    np.testing.assert_array_equal(simulation.history['pos1'][:11], first_positions)
+    assert simulation.history['time'][-1] == pytest.approx(simulation.time)
+
+
+def test_history_is_stable_after_run(simulation):
+    """Test that history returns one dict whose assigned entries persist."""
+    simulation.run(n_steps=10)
+    history = simulation.history
+    history['distance'] = np.hypot(*(history['pos1'] - history['pos2']).T)
+
+    assert simulation.history is history
+    assert simulation.history['distance'].shape == (11,)
+
+
+def test_run_numba_matches_step(lj_potential):
+    """Test that the compiled kernel reproduces the Python step() loop."""
+    def make_sim():
+        particle1 = Particle(
+            position=np.array([1.0, 10.0]),
+            velocity=np.array([-0.05, 0.03]),
+            mass=39.948
+        )
+        particle2 = Particle(
+            position=np.array([6.0, 10.0]),
+            velocity=np.array([0.02, 0.0]),
+            mass=39.948
+        )
+        return TwoParticleMD(particle1, particle2, lj_potential,
+                             box_size=(20.0, 20.0), dt=1.0)
+
+    sim_python = make_sim()
+    for _ in range(500):
+        sim_python.step()
+
+    sim_numba = make_sim()
+    sim_numba.run_numba(500)
+
+    np.testing.assert_allclose(sim_numba.particle1.position, sim_python.particle1.position, rtol=1e-9)
+    np.testing.assert_allclose(sim_numba.particle2.velocity, sim_python.particle2.velocity, rtol=1e-9)
+    assert sim_numba.wall_collision_count_1 == sim_python.wall_collision_count_1
+    assert sim_numba.wall_collision_count_1 > 0
+    assert sim_numba.time == pytest.approx(sim_python.time, rel=1e-10)
+    assert len(sim_numba.history['time']) == 0
+
+
+def test_particle_state_shared_with_simulation(lj_potential):
+    """Test that particle arrays are views updated in place by step()."""
+    p1 = Particle(position=[4.0, 5.0], velocity=[0.1, 0.0], mass=1.0)
+    p2 = Particle(position=[6.0, 5.0], velocity=[-0.1, 0.0], mass=1.0)
+    sim = TwoParticleMD(p1, p2, lj_potential, box_size=(10.0, 10.0), dt=0.01)
+
+    position = p1.position
+    sim.step()
+
+    assert p1.position is position
+    np.testing.assert_array_equal(sim._pos[0], p1.position)
+    np.testing.assert_array_equal(sim._force[1], -p1.force)
+
+
+def test_particle_assignment_updates_simulation(lj_potential):
+    """Test that assigning a particle attribute writes into simulation state."""
+    p1 = Particle(position=[4.0, 5.0], velocity=[0.1, 0.0], mass=1.0)
+    p2 = Particle(position=[6.0, 5.0], velocity=[-0.1, 0.0], mass=1.0)
+    sim = TwoParticleMD(p1, p2, lj_potential, box_size=(10.0, 10.0), dt=0.01)
+
+    p2.velocity = np.array([0.0, 0.3])
+
+    np.testing.assert_array_equal(sim._vel[1], [0.0, 0.3])
+
+
+def test_mass_and_fixed_changes_reach_integrator(lj_potential):
+    """Test that changing mass or is_fixed after construction affects step()."""
+    def make_sim(mass1, fixed2):
+        p1 = Particle(position=[6.0, 10.0], velocity=[0.01, 0.0], mass=mass1)
+        p2 = Particle(position=[10.0, 10.0], velocity=[0.0, 0.0], mass=39.948,
+                      is_fixed=fixed2)
+        return TwoParticleMD(p1, p2, lj_potential, box_size=(20.0, 20.0), dt=1.0)
+
+    sim = make_sim(39.948, fixed2=True)
+    sim.particle1.mass = 2 * 39.948
+    sim.particle2.is_fixed = False
+    reference = make_sim(2 * 39.948, fixed2=False)
+
+    assert sim._mobile_index == reference._mobile_index == -1
+    assert sim._is_fixed[1] == 0 and sim._mass[0] == 2 * 39.948
+    for _ in range(50):
+        sim.step()
+        reference.step()
+
+    np.testing.assert_allclose(sim._pos, reference._pos, rtol=1e-12)
+    np.testing.assert_allclose(sim._vel, reference._vel, rtol=1e-12)
+    assert sim.particle2.kinetic_energy == pytest.approx(reference.particle2.kinetic_energy)
+
+
+def test_fixed_particle_fast_path_matches_general_step(lj_potential):
+    """Test that the one-fixed-particle kernel matches the general step."""
+    def make_sim():
+        particle1 = Particle(position=[1.0, 10.0], velocity=[-0.2, 0.03], mass=39.948)
+        particle2 = Particle(position=[6.0, 10.0], velocity=[0.0, 0.0],
+                             mass=39.948, is_fixed=True)
+        return TwoParticleMD(particle1, particle2, lj_potential,
+                             box_size=(20.0, 20.0), dt=1.0)
+
+    sim_fast = make_sim()
+    sim_general = make_sim()
+    sim_general._mobile_index = -1  # force the general kernel
+    for _ in range(500):
+        sim_fast.step()
+        sim_general.step()
+
+    np.testing.assert_allclose(sim_fast._pos, sim_general._pos, rtol=1e-12)
+    np.testing.assert_allclose(sim_fast._vel, sim_general._vel, rtol=1e-12)
+    np.testing.assert_array_equal(sim_fast.particle2.position, [6.0, 10.0])
+    assert sim_fast.wall_collision_count_1 == sim_general.wall_collision_count_1 > 0
+
+
+def test_deepcopy_keeps_particles_bound(_template_sim):
+    """Test that a deep-copied simulation owns its state and particle views."""
+    sim = copy.deepcopy(_template_sim)
+    sim.step()
 
+    assert sim.particle1.position is not _template_sim.particle1.position
+    np.testing.assert_array_equal(sim._pos[0], sim.particle1.position)
+    np.testing.assert_array_equal(_template_sim.particle1.position, [5.0, 10.0])
+    sim.particle1.velocity = [0.0, 0.5]
+    np.testing.assert_array_equal(sim._vel[0], [0.0, 0.5])
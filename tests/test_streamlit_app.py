@@ -4,28 +4,19 @@ Unit tests for the Streamlit MD Simulation App.
 Uses Streamlit's official testing framework (AppTest) to test the app
 without running a browser.
 """
+import copy
+from types import SimpleNamespace
 import pytest
-import sys
 import os
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend for CI
 import matplotlib.pyplot as plt
 
-# Add parent directory to path to import from src
-_current_dir = os.path.dirname(os.path.abspath(__file__))
-_project_root = os.path.abspath(os.path.join(_current_dir, '..'))
-_src_dir = os.path.join(_project_root, 'src')
-
-if _project_root not in sys.path:
-    sys.path.insert(0, _project_root)
-if _src_dir not in sys.path:
-    sys.path.insert(0, _src_dir)
-
 from streamlit.testing.v1 import AppTest
 
 # Path to the streamlit app
-APP_PATH = os.path.join(_src_dir, 'streamlit_app.py')
+APP_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'streamlit_app.py'))
 
 
 @pytest.fixture(autouse=True)
@@ -35,46 +26,55 @@ def cleanup_matplotlib():
     plt.close('all')
 
 
+@pytest.fixture(scope="module")
+def base_app():
+    """One loaded app shared by the read-only tests of this module.
+
+    Tests that change widget values or click buttons build their own
+    AppTest instead (an AppTest holds locks and cannot be deep-copied).
+    """
+    return AppTest.from_file(APP_PATH).run()
+
 
 class TestAppLoads:
     """Tests that the app loads correctly."""
     
-    def test_app_loads_without_errors(self):
+    def test_app_loads_without_errors(self, base_app):
         """Test that the app loads without throwing any exceptions."""
-        at = AppTest.from_file(APP_PATH).run()
+        at = base_app
         assert not at.exception, f"App raised exception: {at.exception}"
     
-    def test_app_has_title(self):
+    def test_app_has_title(self, base_app):
         """Test that the app displays a title."""
-        at = AppTest.from_file(APP_PATH).run()
+        at = base_app
         # Check that markdown or title exists
         assert len(at.title) > 0 or len(at.markdown) > 0
     
-    def test_app_has_run_button(self):
+    def test_app_has_run_button(self, base_app):
         """Test that the app has a Run Simulation button."""
-        at = AppTest.from_file(APP_PATH).run()
+        at = base_app
         assert len(at.button) > 0, "App should have at least one button"
 
 
 class TestParameterInputs:
     """Tests for parameter input widgets."""
     
-    def test_number_inputs_exist(self):
+    def test_number_inputs_exist(self, base_app):
         """Test that the app has number input widgets for parameters."""
-        at = AppTest.from_file(APP_PATH).run()
+        at = base_app
         # There should be many number inputs for all the parameters
         assert len(at.number_input) >= 10, "App should have multiple number inputs for parameters"
     
-    def test_epsilon_input(self):
+    def test_epsilon_input(self, base_app):
         """Test epsilon (LJ potential) input."""
-        at = AppTest.from_file(APP_PATH).run()
+        at = base_app
         # First number input should be epsilon with default 0.238
         epsilon_input = at.number_input[0]
         assert epsilon_input.value == pytest.approx(0.238, rel=1e-3)
     
-    def test_sigma_input(self):
+    def test_sigma_input(self, base_app):
         """Test sigma (LJ potential) input."""
-        at = AppTest.from_file(APP_PATH).run()
+        at = base_app
         # Second number input should be sigma with default 3.4
         sigma_input = at.number_input[1]
         assert sigma_input.value == pytest.approx(3.4, rel=1e-2)
@@ -86,9 +86,9 @@ class TestParameterInputs:
         at.number_input[0].set_value(0.5).run()
         assert at.number_input[0].value == pytest.approx(0.5, rel=1e-3)
     
-    def test_checkboxes_exist(self):
+    def test_checkboxes_exist(self, base_app):
         """Test that fixed particle checkboxes exist."""
-        at = AppTest.from_file(APP_PATH).run()
+        at = base_app
         # Should have 2 checkboxes for fixed particles
         assert len(at.checkbox) >= 2, "App should have checkboxes for fixed particles"
 
@@ -96,6 +96,7 @@ class TestParameterInputs:
 class TestSimulationExecution:
     """Tests for running the simulation."""
     
+    @pytest.mark.slow
     def test_run_button_click(self):
         """Test that clicking Run Simulation button doesn't cause errors."""
         at = AppTest.from_file(APP_PATH).run()
@@ -111,6 +112,7 @@ class TestSimulationExecution:
         # Check no exceptions occurred
         assert not at.exception, f"Simulation raised exception: {at.exception}"
     
+    @pytest.mark.slow
     def test_simulation_produces_results(self):
         """Test that running simulation produces visualizations."""
         at = AppTest.from_file(APP_PATH).run()
@@ -124,6 +126,7 @@ class TestSimulationExecution:
         # After running, there should be tabs for visualization
         assert len(at.tabs) > 0 or 'simulation' in at.session_state
     
+    @pytest.mark.slow
     def test_session_state_stores_simulation(self):
         """Test that simulation is stored in session state after running."""
         at = AppTest.from_file(APP_PATH).run()
@@ -138,133 +141,186 @@ class TestSimulationExecution:
         assert 'simulation' in at.session_state, "Simulation should be stored in session_state"
 
 
-class TestVisualizationFunctions:
-    """Tests for visualization helper functions."""
-    
-    def test_create_trajectory_figure(self):
-        """Test that trajectory figure can be created."""
-        from src.streamlit_app import create_trajectory_figure
-        from src.md_simulation import Particle, LennardJonesPotential, TwoParticleMD
-        
-        # Create a minimal simulation
-        lj = LennardJonesPotential(epsilon=0.238, sigma=3.4)
-        p1 = Particle(position=np.array([5.0, 10.0]), velocity=np.array([0.01, 0.0]), mass=39.948)
-        p2 = Particle(position=np.array([15.0, 10.0]), velocity=np.array([0.0, 0.0]), mass=39.948, is_fixed=True)
-        sim = TwoParticleMD(p1, p2, lj, box_size=(20.0, 20.0), dt=1.0)
-        
-        # Run a few steps
-        for _ in range(10):
-            sim.step()
-            sim.history['pos1'].append(sim.particle1.position.copy())
-            sim.history['pos2'].append(sim.particle2.position.copy())
-        
-        # Create figure
-        fig = create_trajectory_figure(sim)
-        assert fig is not None, "Trajectory figure should be created"
-    
-    def test_create_energy_figure(self):
-        """Test that energy figure can be created."""
-        from src.streamlit_app import create_energy_figure
-        from src.md_simulation import Particle, LennardJonesPotential, TwoParticleMD
-        
-        # Create a minimal simulation
-        lj = LennardJonesPotential(epsilon=0.238, sigma=3.4)
-        p1 = Particle(position=np.array([5.0, 10.0]), velocity=np.array([0.01, 0.0]), mass=39.948)
-        p2 = Particle(position=np.array([15.0, 10.0]), velocity=np.array([0.0, 0.0]), mass=39.948, is_fixed=True)
-        sim = TwoParticleMD(p1, p2, lj, box_size=(20.0, 20.0), dt=1.0)
-        
-        # Run and record
-        for _ in range(10):
-            sim.step()
-            sim.history['time'].append(sim.time)
-            ke, pe, total = sim.get_energies()
-            sim.history['kinetic'].append(ke)
-            sim.history['potential'].append(pe)
-            sim.history['total'].append(total)
-        
-        # Create figure
-        fig = create_energy_figure(sim)
-        assert fig is not None, "Energy figure should be created"
-
-    def test_create_distance_figure(self):
-        """Test that distance figure can be created."""
-        from src.streamlit_app import create_distance_figure
-        from src.md_simulation import Particle, LennardJonesPotential, TwoParticleMD
-
-        # Create a minimal simulation
-        lj = LennardJonesPotential(epsilon=0.238, sigma=3.4)
-        p1 = Particle(position=np.array([5.0, 10.0]), velocity=np.array([0.01, 0.0]), mass=39.948)
-        p2 = Particle(position=np.array([15.0, 10.0]), velocity=np.array([0.0, 0.0]), mass=39.948, is_fixed=True)
-        sim = TwoParticleMD(p1, p2, lj, box_size=(20.0, 20.0), dt=1.0)
+@pytest.fixture(scope="module")
+def _ran_sim(_template_sim):
+    """Simulation run once for 50 steps with every history field filled."""
+    sim = copy.deepcopy(_template_sim)
+    sim.run(n_steps=50, record_interval=1)
+    return sim
 
-        # Run and record
-        for _ in range(10):
-            sim.step()
-            sim.history['time'].append(sim.time)
-            sim.history['pos1'].append(sim.particle1.position.copy())
-            sim.history['pos2'].append(sim.particle2.position.copy())
 
-        # Create figure
-        fig = create_distance_figure(sim)
-        assert fig is not None, "Distance figure should be created"
+class TestVisualizationFunctions:
+    """Tests for visualization helper functions."""
 
-    def test_create_plotly_animated_trajectory(self):
-        """Test that Plotly animated trajectory can be created."""
+    @pytest.mark.parametrize("fig_fn, kwargs", [
+        ("create_trajectory_figure", {}),
+        ("create_energy_figure", {}),
+        ("create_distance_figure", {}),
+        ("create_plotly_animated_trajectory", {"frame_step": 5}),
+    ])
+    def test_create_figure(self, _ran_sim, fig_fn, kwargs):
+        """Test that each figure can be created from a simulation history."""
+        import src.streamlit_app as app
+
+        fig = getattr(app, fig_fn)(_ran_sim, **kwargs)
+        assert fig is not None, f"{fig_fn} should create a figure"
+
+    def test_plotly_animation_frames(self, _ran_sim):
+        """Test the frames of the Plotly animated trajectory."""
         from src.streamlit_app import create_plotly_animated_trajectory
-        from src.md_simulation import Particle, LennardJonesPotential, TwoParticleMD
-
-        # Create a minimal simulation
-        lj = LennardJonesPotential(epsilon=0.238, sigma=3.4)
-        p1 = Particle(position=np.array([5.0, 10.0]), velocity=np.array([0.01, 0.0]), mass=39.948)
-        p2 = Particle(position=np.array([15.0, 10.0]), velocity=np.array([0.0, 0.0]), mass=39.948, is_fixed=True)
-        sim = TwoParticleMD(p1, p2, lj, box_size=(20.0, 20.0), dt=1.0)
-
-        # Run and record history
-        sim.history['time'].append(sim.time)
-        sim.history['pos1'].append(sim.particle1.position.copy())
-        sim.history['pos2'].append(sim.particle2.position.copy())
-
-        for _ in range(50):
-            sim.step()
-            sim.history['time'].append(sim.time)
-            sim.history['pos1'].append(sim.particle1.position.copy())
-            sim.history['pos2'].append(sim.particle2.position.copy())
 
         # Create Plotly figure with small frame step
-        fig = create_plotly_animated_trajectory(sim, frame_step=5)
-        assert fig is not None, "Plotly animated figure should be created"
+        fig = create_plotly_animated_trajectory(_ran_sim, frame_step=5)
         # Check that figure has frames for animation
         assert len(fig.frames) > 0, "Plotly figure should have animation frames"
-
-
-class TestEmptyHistory:
-    """Tests for edge cases with empty history."""
-
-    def test_trajectory_figure_empty_history(self):
-        """Test trajectory figure returns None for empty history."""
-        from src.streamlit_app import create_trajectory_figure
+        # Frames only update the particle and path traces; paths use WebGL
+        assert list(fig.frames[-1].traces) == [0, 1, 4, 5]
+        assert [fig.data[i].name for i in fig.frames[-1].traces[2:]] == ['Path 1', 'Path 2']
+        assert [t.type for t in fig.frames[-1].data[-2:]] == ['scattergl', 'scattergl']
+
+
+class TestCachedSimulation:
+    """Tests for the cached simulation driver and figure builders."""
+
+    def test_run_sim_returns_history_arrays(self):
+        """Test that run_sim returns one array row per recorded state."""
+        from src.streamlit_app import run_sim
+
+        history = run_sim(0.238, 3.4, 20.0, 20.0, 1.0, 20, 42,
+                          39.948, 0.02, 0.02, False, 39.948, 0.0, 0.0, True)
+        assert history['pos1'].shape == (21, 2)
+        assert history['total'].shape == (21,)
+        np.testing.assert_allclose(history['time'], np.arange(21.0))
+        # Initial positions respect the minimum separation of 2 sigma
+        assert np.linalg.norm(history['pos1'][0] - history['pos2'][0]) >= 2 * 3.4
+        # Fixed particle 2 never moves
+        np.testing.assert_array_equal(history['pos2'], np.broadcast_to(history['pos2'][0], (21, 2)))
+
+    def test_chunked_run_matches_step(self):
+        """Test that running in progress chunks continues one trajectory."""
+        from src.streamlit_app import simulate, PROGRESS_CHUNKS
         from src.md_simulation import Particle, LennardJonesPotential, TwoParticleMD
 
+        calls = []
+        history = simulate(0.238, 3.4, 20.0, 20.0, 1.0, 205, 7,
+                           39.948, 0.05, -0.03, False, 39.948, 0.0, 0.0, True,
+                           progress=lambda done, total: calls.append(done))
+        assert len(calls) == PROGRESS_CHUNKS and calls[-1] == 205
+
         lj = LennardJonesPotential(epsilon=0.238, sigma=3.4)
-        p1 = Particle(position=np.array([5.0, 10.0]), velocity=np.array([0.01, 0.0]), mass=39.948)
-        p2 = Particle(position=np.array([15.0, 10.0]), velocity=np.array([0.0, 0.0]), mass=39.948)
+        p1 = Particle(position=history['pos1'][0], velocity=[0.05, -0.03], mass=39.948)
+        p2 = Particle(position=history['pos2'][0], velocity=[0.0, 0.0], mass=39.948, is_fixed=True)
         sim = TwoParticleMD(p1, p2, lj, box_size=(20.0, 20.0), dt=1.0)
+        for _ in range(205):
+            sim.step()
+        np.testing.assert_allclose(history['pos1'][-1], sim.particle1.position, rtol=1e-9)
+        assert history['wall_collisions_1'][-1] == sim.wall_collision_count_1
+
+    def test_simulate_falls_back_when_box_too_small_for_sigma(self):
+        """Test that simulate() starts from the best-separated pair when none is 2 sigma apart."""
+        from src.streamlit_app import simulate
+
+        history = simulate(0.238, 3.4, 8.0, 8.0, 1.0, 10, 42,
+                           39.948, 0.0, 0.0, False, 39.948, 0.0, 0.0, False)
+        separation = np.linalg.norm(history['pos1'][0] - history['pos2'][0])
+        assert 0.0 < separation < 2 * 3.4
+        assert np.isfinite(history['total']).all()
+
+    @pytest.mark.slow
+    def test_run_warns_when_box_too_small_for_sigma(self):
+        """Test that the app warns instead of failing when the particles start too close."""
+        at = AppTest.from_file(APP_PATH).run()
+        at.number_input[1].set_value(6.0).run()  # sigma: no pair 2 sigma apart in 20 x 20
+        at.number_input[5].set_value(10).run()
+        at.button[0].click().run(timeout=10)
 
-        # Don't run any steps - history is empty
-        fig = create_trajectory_figure(sim)
-        assert fig is None, "Should return None for empty history"
+        assert not at.exception, f"Simulation raised exception: {at.exception}"
+        assert any("Could not place the particles" in w.value for w in at.warning)
+        assert 'simulation' in at.session_state
+
+    def test_potential_is_shared(self):
+        """Test that get_potential returns one instance per parameter pair."""
+        from src.streamlit_app import get_potential
+
+        lj = get_potential(0.238, 3.4)
+        assert get_potential(0.238, 3.4) is lj
+        assert get_potential(0.5, 3.4) is not lj
+        assert lj.sigma == 3.4
+
+    def test_figure_builders_are_cached(self):
+        """Test that identical arrays return the cached figure."""
+        from src.streamlit_app import trajectory_figure
+
+        pos1 = np.array([[1.0, 2.0], [2.0, 3.0], [3.0, 4.0]])
+        pos2 = np.array([[10.0, 10.0], [10.0, 10.0], [10.0, 10.0]])
+        fig = trajectory_figure(pos1, pos2, (20.0, 20.0))
+        assert trajectory_figure(pos1.copy(), pos2.copy(), (20.0, 20.0)) is fig
+        assert trajectory_figure(pos1, pos2, (30.0, 20.0)) is not fig
+
+    def test_long_trajectory_is_decimated(self):
+        """Test that long paths are drawn decimated and rasterized."""
+        from src.streamlit_app import trajectory_figure, MAX_PLOT_POINTS
+
+        n = 4 * MAX_PLOT_POINTS + 3
+        pos1 = np.column_stack([np.linspace(1.0, 19.0, n), np.full(n, 5.0)])
+        pos2 = np.full((n, 2), 10.0)
+        fig = trajectory_figure(pos1, pos2, (20.0, 20.0))
+        path1 = fig.axes[0].lines[1]
+        assert path1.get_rasterized()
+        assert len(path1.get_xdata()) <= MAX_PLOT_POINTS + 1
+        assert path1.get_xdata()[-1] == pos1[-1, 0]
+        assert not path1.get_antialiased()
+
+    def test_energy_and_distance_figures_are_decimated(self):
+        """Test that the energy and distance curves honor max_points."""
+        from src.streamlit_app import energy_figure, distance_figure
+
+        n = 10001
+        time = np.arange(n, dtype=float)
+        energies = np.sin(time / 100.0)
+        pos1 = np.column_stack([np.linspace(1.0, 19.0, n), np.full(n, 5.0)])
+        pos2 = np.full((n, 2), 10.0)
+
+        fig = energy_figure(time, energies, energies, 2 * energies, max_points=1000)
+        assert all(len(line.get_xdata()) <= 1001 for line in fig.axes[0].lines)
+        fig = distance_figure(time, pos1, pos2, 3.4, max_points=1000)
+        assert len(fig.axes[0].lines[0].get_xdata()) <= 1001
+
+    def test_animation_frames_follow_path_length(self):
+        """Test that animation frames are spaced by distance travelled."""
+        from src.streamlit_app import _arc_length_frames
+
+        # Particle 1 is at rest for the first half, then moves; particle 2 is fixed
+        n = 1001
+        x = np.concatenate([np.full(500, 1.0), np.linspace(1.0, 19.0, n - 500)])
+        pos1 = np.column_stack([x, np.full(n, 5.0)])
+        pos2 = np.full((n, 2), 10.0)
+        frames = _arc_length_frames(pos1, pos2, 50)
+        assert frames[0] == 0 and frames[-1] == n - 1
+        assert len(frames) <= 52
+        assert sum(i < 500 for i in frames) <= 2
+
+        # Without any motion the frames are spread uniformly
+        frames = _arc_length_frames(pos2, pos2, 50)
+        assert len(frames) == 50
+        assert frames[0] == 0 and frames[-1] == n - 1
 
-    def test_energy_figure_empty_history(self):
-        """Test energy figure returns None for empty history."""
-        from src.streamlit_app import create_energy_figure
-        from src.md_simulation import Particle, LennardJonesPotential, TwoParticleMD
 
-        lj = LennardJonesPotential(epsilon=0.238, sigma=3.4)
-        p1 = Particle(position=np.array([5.0, 10.0]), velocity=np.array([0.01, 0.0]), mass=39.948)
-        p2 = Particle(position=np.array([15.0, 10.0]), velocity=np.array([0.0, 0.0]), mass=39.948)
-        sim = TwoParticleMD(p1, p2, lj, box_size=(20.0, 20.0), dt=1.0)
+class TestEmptyHistory:
+    """Tests for edge cases with empty history."""
 
-        # Don't run any steps - history is empty
-        fig = create_energy_figure(sim)
+    @pytest.mark.parametrize("fig_fn", [
+        "create_trajectory_figure",
+        "create_energy_figure",
+        "create_distance_figure",
+        "create_plotly_animated_trajectory",
+    ])
+    def test_figure_empty_history(self, fig_fn):
+        """Test that each figure helper returns None for an empty history."""
+        import src.streamlit_app as app
+        from src.md_simulation import HISTORY_KEYS
+
+        # The helpers only read sim.history before returning
+        stub = SimpleNamespace(history={key: [] for key in HISTORY_KEYS})
+        fig = getattr(app, fig_fn)(stub)
         assert fig is None, "Should return None for empty history"
-